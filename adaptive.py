@@ -0,0 +1,128 @@
+"""
+Adaptive difficulty for QuizEngine.
+
+An AdaptiveProfile keeps exponentially weighted running accuracy and
+response time per operator, a few floats each no matter how long the
+player has been playing. From those it widens or narrows the operand range
+of the base difficulty and weights operators towards the ones the player
+gets wrong. Profiles are stored per player in one JSON file, so a new
+session picks up where the last one stopped without replaying history.
+"""
+import json
+import os
+import tempfile
+
+from quiz_core import DIFFICULTY_SETTINGS, OPERATORS
+
+PLAYER_STATS_FILE = "player_stats.json"
+
+TARGET_ACCURACY = 0.75
+MIN_LEVEL = 0.5
+MAX_LEVEL = 4.0
+
+
+class OperatorStats:
+    __slots__ = ("accuracy", "seconds", "count")
+
+    def __init__(self, accuracy=TARGET_ACCURACY, seconds=None, count=0):
+        self.accuracy = accuracy
+        self.seconds = seconds
+        self.count = count
+
+    def update(self, correct, elapsed, alpha):
+        self.count += 1
+        self.accuracy += alpha * ((1.0 if correct else 0.0) - self.accuracy)
+        if self.seconds is None:
+            self.seconds = elapsed
+        else:
+            self.seconds += alpha * (elapsed - self.seconds)
+
+
+class AdaptiveProfile:
+    def __init__(self, base="Easy", alpha=0.2, level=1.0):
+        self.base = base
+        self.alpha = alpha
+        self.level = level
+        self.stats = {op: OperatorStats() for op in OPERATORS}
+
+    def record(self, op, correct, elapsed):
+        """Fold one answer into the running stats and nudge the level."""
+        s = self.stats[op]
+        s.update(correct, elapsed, self.alpha)
+
+        # Fast means this operator's running response time, not one lucky answer
+        timer = DIFFICULTY_SETTINGS[self.base]["timer"]
+        if correct and s.seconds < timer / 3:
+            step = 1.08
+        elif correct:
+            step = 1.02
+        else:
+            step = 0.9
+        # Do not make things harder while this operator is still below target
+        if s.accuracy < TARGET_ACCURACY and step > 1:
+            step = 1.0
+        self.level = min(MAX_LEVEL, max(MIN_LEVEL, self.level * step))
+
+    def settings(self):
+        """A DIFFICULTY_SETTINGS-style dict for the next question, with operator weights."""
+        base = DIFFICULTY_SETTINGS[self.base]
+        minv, maxv = base["min"], base["max"]
+        span = (maxv - minv) * self.level
+        if base["allow_decimal"]:
+            maxv = minv + span
+        else:
+            maxv = minv + max(1, round(span))
+
+        ops = base["operators"]
+        # Weak operators come up more often, but none disappears entirely
+        weights = [0.25 + (1.0 - self.stats[op].accuracy) for op in ops]
+        return dict(base, max=maxv, weights=weights)
+
+    # ---------- persistence ----------
+    def to_dict(self):
+        return {
+            "base": self.base,
+            "alpha": self.alpha,
+            "level": self.level,
+            "stats": {op: [s.accuracy, s.seconds, s.count] for op, s in self.stats.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data.get("base", "Easy"), data.get("alpha", 0.2), data.get("level", 1.0))
+        for op, (accuracy, seconds, count) in data.get("stats", {}).items():
+            if op in profile.stats:
+                profile.stats[op] = OperatorStats(accuracy, seconds, count)
+        return profile
+
+
+class PlayerStatsStore:
+    """Adaptive profiles for every player, kept in one small JSON file."""
+    def __init__(self, filename=PLAYER_STATS_FILE):
+        self.filename = filename
+
+    def _read(self):
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def load(self, name, base="Easy"):
+        data = self._read().get(name, {}).get(base)
+        return AdaptiveProfile.from_dict(data) if data else AdaptiveProfile(base)
+
+    def save(self, name, profile):
+        data = self._read()
+        data.setdefault(name, {})[profile.base] = profile.to_dict()
+
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp = tempfile.mkstemp(prefix=".player-stats-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
@@ -0,0 +1,198 @@
+"""
+Benchmarks for the joke assistant (exercise2).
+
+Time to first joke compares opening a corpus with no saved index in one
+go against CorpusLoader, which hands over the first chunk while it keeps
+scanning. Draws compare the old list of patched strings, split on every
+draw, with JokeStore and the memory-mapped JokeCorpus, in draws per second
+and bytes held per joke. The gradient figures need a display: they build a JokeApp in a
+hidden Tk root and report construction time and how many canvas items it
+holds, next to the old one-line-per-row background for comparison.
+
+    python bench_jokes.py --runs 10
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from joke_corpus import CorpusLoader, JokeCorpus
+from joke_store import JokeStore
+from tk_gradient import hex_to_rgb
+
+CORPUS_SIZES = [10000, 100000, 1000000]
+
+COLORS = ("#0A0F24", "#20295B")
+
+
+def draw_gradient_lines(canvas, color1, color2, width=600, height=500):
+    """The background as it used to be drawn: a canvas line per row."""
+    for i in range(height):
+        r1, g1, b1 = hex_to_rgb(color1)
+        r2, g2, b2 = hex_to_rgb(color2)
+        r = int(r1 + (r2 - r1) * i / height)
+        g = int(g1 + (g2 - g1) * i / height)
+        b = int(b1 + (b2 - b1) * i / height)
+        canvas.create_line(0, i, width, i, fill=f"#{r:02x}{g:02x}{b:02x}")
+
+
+def median_ms(samples):
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def bench_gradient(runs):
+    import tkinter as tk
+
+    from exercise2 import JokeApp
+    from tk_gradient import GradientCache
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"no display: {e}"}
+    root.withdraw()
+    try:
+        lines, image, cold, warm, apps = [], [], [], [], []
+        for _ in range(runs):
+            canvas = tk.Canvas(root, width=600, height=500)
+            start = time.perf_counter()
+            draw_gradient_lines(canvas, *COLORS)
+            root.update_idletasks()
+            lines.append(time.perf_counter() - start)
+            line_items = len(canvas.find_all())
+            canvas.destroy()
+
+            cache = GradientCache(root)
+            start = time.perf_counter()
+            cache.get(*COLORS, 600, 500)
+            cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            cache.get(*COLORS, 600, 500)
+            warm.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            cache.get(*COLORS, 800, 500)
+            image.append(time.perf_counter() - start)
+
+            top = tk.Toplevel(root)
+            start = time.perf_counter()
+            app = JokeApp(top)
+            root.update_idletasks()
+            apps.append(time.perf_counter() - start)
+            app_items = len(app.canvas.find_all())
+            top.destroy()
+    finally:
+        root.destroy()
+
+    return {
+        "lines": {"draw_ms": median_ms(lines), "canvas_items": line_items},
+        "image": {"build_ms": median_ms(cold), "cached_ms": median_ms(warm),
+                  "resize_width_ms": median_ms(image)},
+        "jokeapp": {"startup_ms": median_ms(apps), "canvas_items": app_items},
+    }
+
+
+def write_corpus(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"Why did joke number {i} cross the road?To get to line {i + 1}.\n")
+
+
+def bench_first_joke(sizes=CORPUS_SIZES):
+    tmpdir = tempfile.mkdtemp(prefix="jokes-bench-")
+    results = {}
+    try:
+        for n in sizes:
+            path = os.path.join(tmpdir, f"jokes{n}.txt")
+            write_corpus(path, n)
+
+            start = time.perf_counter()
+            with JokeCorpus(path, index_path=path + ".sync") as corpus:
+                corpus.joke(0)
+            sync = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loader = CorpusLoader(path).start()
+            kind, corpus = loader.updates.get()
+            corpus.joke(0)
+            first = time.perf_counter() - start
+            while kind != "done":
+                kind, _ = loader.updates.get()
+            full = time.perf_counter() - start
+            corpus.close()
+
+            results[n] = {"sync_open_ms": round(sync * 1000, 2),
+                          "loader_first_joke_ms": round(first * 1000, 2),
+                          "loader_done_ms": round(full * 1000, 2)}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+def load_list(path):
+    """The corpus as exercise2 used to hold it."""
+    with open(path, "r", encoding="utf-8") as file:
+        jokes = [line.strip() for line in file.readlines() if line.strip()]
+    return [joke if "?" in joke else joke + "?Oops! Punchline missing." for joke in jokes]
+
+
+def draws_per_sec(draw, n, seconds=0.5):
+    rng = random.Random(0)
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(1000):
+            draw(rng.randrange(n))
+        count += 1000
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return round(count / elapsed)
+
+
+def bench_draws(sizes=CORPUS_SIZES):
+    tmpdir = tempfile.mkdtemp(prefix="jokes-bench-")
+    results = {}
+    try:
+        for n in sizes:
+            path = os.path.join(tmpdir, f"jokes{n}.txt")
+            write_corpus(path, n)
+
+            jokes = load_list(path)
+
+            def draw_list(i):
+                parts = jokes[i].split("?", 1)
+                return parts[0] + "?", parts[1]
+
+            list_bytes = sys.getsizeof(jokes) + sum(sys.getsizeof(j) for j in jokes)
+
+            with JokeCorpus(path) as corpus:
+                store = JokeStore.from_corpus(corpus)
+                results[n] = {
+                    "list": {"draws_per_sec": draws_per_sec(draw_list, n),
+                             "bytes_per_joke": round(list_bytes / n, 1)},
+                    "store": {"draws_per_sec": draws_per_sec(store.joke, n),
+                              "bytes_per_joke": round(store.nbytes() / n, 1)},
+                    "mmap": {"draws_per_sec": draws_per_sec(corpus.joke, n),
+                             "index_bytes_per_joke": round(
+                                 corpus.all_offsets.itemsize * len(corpus.all_offsets) / n, 1)},
+                }
+            del jokes
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Joke assistant benchmarks")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps({"draws": bench_draws(), "first_joke": bench_first_joke(),
+                      "gradient": bench_gradient(args.runs)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
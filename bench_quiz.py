@@ -0,0 +1,187 @@
+"""
+Benchmarks for the quiz hot paths, no Tk window needed.
+
+Covers QuizEngine.new_question, QuizEngine.generate_bank, Question.check and
+Question.text for every difficulty, and Leaderboard startup, add_score and
+queries on logs from 10 to 1M entries. Reports operations per second and
+tracemalloc figures, and writes everything to JSON so runs can be compared:
+
+    python bench_quiz.py --out before.json
+    python bench_quiz.py --out after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from leaderboard import Leaderboard
+from quiz_core import DIFFICULTY_SETTINGS, QuizEngine
+
+LEADERBOARD_SIZES = [10, 1000, 100000, 1000000]
+
+
+def timed(fn, n, repeat=3):
+    """Best ops/sec of fn(n) over a few runs; fn must do n operations and return their results."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - start)
+    return n / best if best else float("inf")
+
+
+def allocations(fn, n):
+    """
+    Blocks allocated per operation, and the peak traced size. fn(n) returns
+    what its operations produced, and that is held while the second
+    snapshot is taken, so the results count instead of being freed first.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        kept = fn(n)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        del kept
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    return {"blocks_per_op": round(blocks / n, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def result(fn, n):
+    out = {"ops_per_sec": round(timed(fn, n), 1)}
+    out.update(allocations(fn, n))
+    return out
+
+
+def bench_engine(difficulty, n):
+    engine = QuizEngine(difficulty, n)
+    questions = [engine.new_question() for _ in range(n)]
+    answers = [str(q.answer) if i % 4 else "oops" for i, q in enumerate(questions)]
+
+    def new_question(k):
+        return [engine.new_question() for _ in range(k)]
+
+    def generate_bank(k):
+        return engine.generate_bank(k)
+
+    def check(k):
+        return [q.check(a) for q, a in zip(questions[:k], answers[:k])]
+
+    def text(k):
+        return [q.text() for q in questions[:k]]
+
+    def submit(k):
+        e = QuizEngine(difficulty, k)
+        results = []
+        for _ in range(k):
+            e.new_question()
+            results.append(e.submit_answer("1"))
+        return results
+
+    return {
+        "new_question": result(new_question, n),
+        "generate_bank": result(generate_bank, n),
+        "check": result(check, n),
+        "text": result(text, n),
+        "session": result(submit, n),
+    }
+
+
+def write_log(path, n, seed=0):
+    rng = random.Random(seed)
+    diffs = list(DIFFICULTY_SETTINGS)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"name": f"p{i % 10000}", "score": rng.randint(0, 10),
+                                "difficulty": diffs[i % 3],
+                                "date": "2024-01-01T00:00:00Z"}, separators=(",", ":")) + "\n")
+
+
+def bench_leaderboard(size, adds):
+    tmpdir = tempfile.mkdtemp(prefix="bench-lb-")
+    try:
+        path = os.path.join(tmpdir, "scores.log")
+        write_log(path, size)
+
+        start = time.perf_counter()
+        lb = Leaderboard(path, legacy_file=None)
+        load_s = time.perf_counter() - start
+
+        def add(k):
+            # What an add allocates stays in the leaderboard's index and heaps
+            for i in range(k):
+                lb.add_score(f"bench{i}", i % 11, "Easy")
+
+        def top(k):
+            return [lb.top_scores() for _ in range(k)]
+
+        def rank(k):
+            return [lb.rank_of(f"p{i % 10000}", "Easy") for i in range(k)]
+
+        out = {
+            "load_seconds": round(load_s, 4),
+            "add_score": result(add, adds),
+            "top_scores": result(top, adds),
+            "rank_of": result(rank, adds),
+        }
+        lb.close()
+        return out
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def compare(new, old, path=""):
+    """Print ops_per_sec changes between two result trees."""
+    for key, value in new.items():
+        if isinstance(value, dict):
+            if isinstance(old.get(key), dict):
+                compare(value, old[key], f"{path}{key}.")
+        elif key == "ops_per_sec" and old.get(key):
+            ratio = value / old[key]
+            flag = "  <-- slower" if ratio < 0.9 else ""
+            print(f"{path[:-1]:45s} {old[key]:>14,.0f} -> {value:>14,.0f}  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quiz hot-path benchmarks")
+    parser.add_argument("-n", type=int, default=20000, help="operations per measurement")
+    parser.add_argument("--sizes", type=int, nargs="*", default=LEADERBOARD_SIZES,
+                        help="leaderboard log sizes to test")
+    parser.add_argument("--adds", type=int, default=2000)
+    parser.add_argument("--out", default="bench_quiz.json")
+    parser.add_argument("--compare", default=None, help="earlier results JSON")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "engine": {},
+        "leaderboard": {},
+    }
+    for difficulty in DIFFICULTY_SETTINGS:
+        print(f"engine {difficulty} ...", file=sys.stderr)
+        results["engine"][difficulty] = bench_engine(difficulty, args.n)
+    for size in args.sizes:
+        print(f"leaderboard {size} ...", file=sys.stderr)
+        results["leaderboard"][str(size)] = bench_leaderboard(size, args.adds)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
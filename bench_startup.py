@@ -0,0 +1,72 @@
+"""
+Cold-start import cost of the quiz, in the spirit of `python -X importtime`.
+
+Each path is imported in a fresh interpreter several times. We report the
+median wall time of the whole process, the cumulative import time that
+-X importtime gives for the top-level module, and whether tkinter got
+loaded at all.
+
+    python bench_startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PATHS = {
+    "worker: import quiz_core": "import quiz_core",
+    "cli: import exercise1": "import exercise1",
+    "gui: import exercise1 + quiz_gui": "import exercise1, quiz_gui",
+}
+
+
+def import_time_us(stderr, module):
+    """Cumulative microseconds -X importtime reports for a top-level import."""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            total += int(parts[1])
+    return total
+
+
+def run_once(code):
+    probe = code + "; import sys; print('tkinter' in sys.modules)"
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    modules = [m.strip() for m in code[len("import "):].split(",")]
+    imports = sum(import_time_us(proc.stderr, m) for m in modules)
+    return wall, imports, proc.stdout.strip() == "True"
+
+
+def bench(runs):
+    baseline = statistics.median(run_once("pass")[0] for _ in range(runs))
+    results = {"interpreter_ms": round(baseline * 1000, 2)}
+    for name, code in PATHS.items():
+        samples = [run_once(code) for _ in range(runs)]
+        results[name] = {
+            "wall_ms": round(statistics.median(s[0] for s in samples) * 1000, 2),
+            "import_ms": round(statistics.median(s[1] for s in samples) / 1000, 2),
+            "loads_tkinter": samples[0][2],
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quiz cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,21 @@
 import tkinter as tk
-from tkinter import messagebox
+import os
+import queue
 import random
+import threading
 
-def load_jokes():
-    try:
-        with open("randomJokes.txt", "r", encoding="utf-8") as file:
-            jokes = [line.strip() for line in file.readlines() if line.strip()]
-    except FileNotFoundError:
-        messagebox.showerror("File Missing", "randomJokes.txt not found!")
-        return []
-    except Exception as e:
-        messagebox.showerror("Error", f"Unable to read file:\n{e}")
-        return []
-
-    valid_jokes = []
-    for joke in jokes:
-        if "?" in joke:
-            valid_jokes.append(joke)
-        else:
-            valid_jokes.append(joke + "?Oops! Punchline missing.")
+from joke_corpus import JOKES_FILE, CorpusLoader, CorpusWatcher, JokeCorpus, StaleCorpusError
+from joke_search import JokeIndex
+from shuffle_bag import BAG_SUFFIX, ShuffleBag
+from tk_animate import TextAnimator
+from tk_gradient import GradientBackground
+from tk_scheduler import Scheduler
 
-    return valid_jokes
+# Similarity (0-1) above which near-duplicate jokes are merged at load; unset keeps all
+DEDUP_THRESHOLD = os.environ.get("JOKES_DEDUP")
+# Socket path or TCP port of a joke_server to ask instead of loading the file here
+JOKES_SERVER = os.environ.get("JOKES_SERVER")
+LOAD_POLL_SECONDS = 0.05
 
 class JokeApp:
 
@@ -30,33 +25,51 @@ class JokeApp:
         self.root.geometry("600x500")
         self.root.resizable(False, False)
 
-        self.jokes = load_jokes()
+        self.jokes = []
+        # Every joke once before any repeats, remembered across runs; sized when loading is done
+        self.bag_file = JOKES_FILE + BAG_SUFFIX
+        self.bag = ShuffleBag.load(self.bag_file)
         self.current_setup = ""
         self.current_punchline = ""
-        self.animation_id = None
+        self.scheduler = Scheduler(root)
+        self.animator = TextAnimator(self.scheduler)
+        self.watcher = None
+        self.search = None
+        self.loader = None
+        self.client = None
+        # Bumped on every press, so a slow topic reply cannot overwrite a newer joke
+        self.presses = 0
+        if JOKES_SERVER:
+            from joke_server import JokeClient, JokePrefetcher
+
+            if JOKES_SERVER.isdigit():
+                self.client = JokeClient(port=int(JOKES_SERVER))
+            else:
+                self.client = JokeClient(JOKES_SERVER)
+            self.prefetcher = JokePrefetcher(self.client).start()
+        else:
+            # Parses the joke file off the Tk thread; jokes can be told from its first chunk on
+            self.loader = CorpusLoader(
+                dedup=float(DEDUP_THRESHOLD) if DEDUP_THRESHOLD else None).start()
+            self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_loader)
 
         self.canvas = tk.Canvas(root, width=600, height=500, highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
+        self.background = None
         self.draw_gradient("#0A0F24", "#20295B")
 
         self.build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def draw_gradient(self, color1, color2):
         """
-        Beautiful vertical gradient background.
+        Beautiful vertical gradient background, one cached image that
+        follows the canvas size.
         """
-        for i in range(500):
-            r1, g1, b1 = self.hex_to_rgb(color1)
-            r2, g2, b2 = self.hex_to_rgb(color2)
-            r = int(r1 + (r2 - r1) * i / 500)
-            g = int(g1 + (g2 - g1) * i / 500)
-            b = int(b1 + (b2 - b1) * i / 500)
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            self.canvas.create_line(0, i, 600, i, fill=color)
-
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip("#")
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        if self.background is None:
+            self.background = GradientBackground(self.canvas, color1, color2)
+        else:
+            self.background.set_colors(color1, color2)
 
     def build_ui(self):
         # Alexa Avatar
@@ -129,51 +142,219 @@ class JokeApp:
         self.quit_btn = tk.Button(
             self.root,
             text="Quit",
-            command=self.root.destroy,
+            command=self.on_close,
             width=10,
             font=("Arial", 11),
             bg="#E57373"
         )
         self.quit_btn.place(x=255, y=430)
 
-    def new_joke(self):
-        if not self.jokes:
-            self.setup_label.config(text="No jokes found!")
-            return
+        self.topic_label = tk.Label(
+            self.root,
+            text="Jokes about:",
+            font=("Arial", 10),
+            bg="#20295B",
+            fg="white"
+        )
+        self.topic_label.place(x=170, y=470)
 
-        joke = random.choice(self.jokes)
-        parts = joke.split("?", 1)
+        # Words to match, 'pizz*' for a prefix; empty means any joke
+        self.topic_var = tk.StringVar()
+        self.topic_entry = tk.Entry(
+            self.root,
+            textvariable=self.topic_var,
+            width=20,
+            font=("Arial", 10)
+        )
+        self.topic_entry.place(x=260, y=470)
+        self.topic_entry.bind("<Return>", lambda event: self.new_joke())
+
+    def new_joke(self):
+        topic = self.topic_var.get().strip()
+        self.presses += 1
+        if self.client is None:
+            self.tell_joke(self.local_joke(topic))
+        elif topic:
+            # Not prefetched, so ask on a worker thread; the Tk thread never waits on the socket
+            self.fetch_topic(topic)
+        else:
+            reply = self.prefetcher.take()
+            if reply is None:
+                self.setup_label.config(text="Fetching a joke, try again in a moment!")
+                return
+            self.tell_joke(self.remote_joke(reply))
 
-        self.current_setup = parts[0] + "?"
-        self.current_punchline = parts[1]
+    def tell_joke(self, joke):
+        if joke is None:
+            return
+        self.current_setup, self.current_punchline = joke
 
         self.avatar.config(text="🤖")
         self.animate_text(self.setup_label, self.current_setup)
+        self.animator.cancel(self.punchline_label)
         self.punchline_label.config(text="")
         self.show_btn.config(state=tk.NORMAL)
 
+    def local_joke(self, topic):
+        """(setup, punchline) from the corpus in this process, or None after saying why not."""
+        if not self.jokes:
+            self.setup_label.config(
+                text="Still loading jokes..." if self.loader is not None else "No jokes found!")
+            return None
+
+        if topic:
+            if self.search is None:
+                self.setup_label.config(text="Still indexing jokes, try again in a moment!")
+                return None
+            index = self.search.random_match(topic)
+            if index is None or index >= len(self.jokes):
+                self.setup_label.config(text=f"No jokes about '{topic}' found!")
+                return None
+        elif self.loader is not None:
+            # The bag needs the final size, so plain random picks until loading is done
+            index = random.randrange(len(self.jokes))
+        else:
+            index = self.bag.draw()
+
+        try:
+            return self.jokes.joke(index)
+        except StaleCorpusError:
+            self.setup_label.config(text="Reloading jokes, try again in a moment!")
+            return None
+
+    def fetch_topic(self, topic):
+        """Ask the joke server for a joke about topic off the Tk thread; poll_topic tells it."""
+        done = queue.Queue()
+
+        def work():
+            try:
+                reply = self.client.request({"cmd": "random", "topic": topic})
+            except (OSError, ValueError) as e:
+                reply = {"error": str(e)}
+            done.put(reply)
+
+        threading.Thread(target=work, name="joke-topic", daemon=True).start()
+        self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_topic, self.presses, topic, done)
+
+    def poll_topic(self, press, topic, done):
+        try:
+            reply = done.get_nowait()
+        except queue.Empty:
+            self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_topic, press, topic, done)
+            return
+        if press == self.presses:
+            self.tell_joke(self.remote_joke(reply, topic))
+
+    def remote_joke(self, reply, topic=""):
+        """(setup, punchline) from a joke server reply, or None after saying why not."""
+        if "error" in reply:
+            self.setup_label.config(text=f"Joke server unavailable:\n{reply['error']}")
+            return None
+        if reply.get("setup") is None:
+            self.setup_label.config(
+                text=f"No jokes about '{topic}' found!" if topic else "No jokes found!")
+            return None
+        return reply["setup"], reply["punchline"]
+
     def show_punchline(self):
         self.animate_text(self.punchline_label, self.current_punchline)
         self.avatar.config(text=random.choice(["😂", "🤣", "😆", "😹"]))
 
     def animate_text(self, widget, text, delay=30):
-        widget.config(text="")
-        self.cancel_animation()
+        """Reveal one character every delay ms, on the shared frame clock."""
+        self.animator.animate(widget, text, cps=1000 / delay)
 
-        def reveal(i=0):
-            if i <= len(text):
-                widget.config(text=text[:i])
-                self.animation_id = self.root.after(delay, reveal, i+1)
+    def cancel_animation(self):
+        self.animator.cancel_all()
 
-        reveal()
+    def poll_loader(self):
+        """Take whatever the loader thread has parsed since the last poll."""
+        while True:
+            try:
+                kind, value = self.loader.updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "corpus":
+                self.jokes = value
+            elif kind == "lines":
+                self.jokes.extend(value)
+            elif kind == "error":
+                self.loader = None
+                self.show_load_error(value)
+                return
+            else:
+                self.loader = None
+                self.use_corpus(value)
+                # Picks up edits to the joke file without a restart
+                self.watcher = CorpusWatcher(self.jokes).start()
+                self.scheduler.call_later(self.watcher.interval, self.poll_corpus)
+                return
+        self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_loader)
 
-    def cancel_animation(self):
-        if self.animation_id:
+    def show_load_error(self, error):
+        if isinstance(error, FileNotFoundError):
+            text = f"{JOKES_FILE} not found!"
+        else:
+            text = f"Unable to read jokes:\n{error}"
+        self.setup_label.config(text=text)
+
+    def poll_corpus(self):
+        fresh = self.watcher.take()
+        if fresh is not None:
+            self.use_corpus(fresh)
+        self.scheduler.call_later(self.watcher.interval, self.poll_corpus)
+
+    def use_corpus(self, corpus):
+        old, self.jokes = self.jokes, corpus
+        self.bag.resize(len(corpus))
+        if not (isinstance(old, JokeCorpus) and corpus.extends(old)):
+            # Renumbered (rewrite, truncation, dedup): the old index would serve the wrong jokes
+            self.search = None
+        if old is not corpus and isinstance(old, JokeCorpus):
+            old.close()
+        self.index_jokes(corpus)
+
+    def index_jokes(self, corpus):
+        """Load or build the search index off the Tk thread; poll_index puts it to use."""
+        done = queue.Queue()
+
+        def work():
+            try:
+                index = JokeIndex.open(corpus)
+            except (OSError, ValueError, StaleCorpusError):
+                # Corpus replaced or closed while we were reading it
+                index = None
+            done.put(index)
+
+        threading.Thread(target=work, name="joke-index", daemon=True).start()
+        self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_index, corpus, done)
+
+    def poll_index(self, corpus, done):
+        try:
+            index = done.get_nowait()
+        except queue.Empty:
+            self.scheduler.call_later(LOAD_POLL_SECONDS, self.poll_index, corpus, done)
+            return
+        # Checked on the Tk thread, so a corpus swapped in meanwhile cannot race it
+        if index is not None and corpus is self.jokes:
+            self.search = index
+
+    def on_close(self):
+        self.animator.cancel_all()
+        self.scheduler.cancel_all()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.client is not None:
+            self.prefetcher.stop()
+            self.client.close()
+        if len(self.bag):
             try:
-                self.root.after_cancel(self.animation_id)
-            except:
+                self.bag.save(self.bag_file)
+            except OSError:
                 pass
-            self.animation_id = None
+        if isinstance(self.jokes, JokeCorpus):
+            self.jokes.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
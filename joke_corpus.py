@@ -0,0 +1,319 @@
+"""
+Random access to big joke files without reading them into memory.
+
+JokeCorpus maps the file with mmap and keeps only an array('Q') of the
+byte offset where each non-blank line starts. The index is saved next to
+the file (randomJokes.txt.idx) together with the file's mtime and size, so
+the next start loads it in one read instead of scanning again. Drawing a
+joke decodes and splits just that one line.
+
+A lazy corpus skips the scan when there is no saved index, and
+scan_chunks() produces the offsets a chunk at a time instead; CorpusLoader
+uses that on a daemon thread so the first jokes can be served before the
+rest of the file is read.
+
+When the file changes, reload() builds a fresh corpus. If the file only
+grew, it copies this index and scans just the appended bytes; a truncated
+or rewritten file is scanned in full. CorpusWatcher does that from a
+daemon thread, so the GUI only ever swaps in a finished corpus.
+"""
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+
+JOKES_FILE = "randomJokes.txt"
+MISSING_PUNCHLINE = "Oops! Punchline missing."
+
+# magic, byte order, mtime_ns, size, line count
+INDEX_HEADER = struct.Struct("<3sc q q Q")
+INDEX_MAGIC = b"JIX"
+BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+# Bytes before the old end compared to tell an append from a rewrite
+TAIL_CHECK = 4096
+
+
+class StaleCorpusError(RuntimeError):
+    """The file was cut short under a live mapping; reload() before reading on."""
+
+
+def split_joke(line):
+    """(setup, punchline) for one joke line; setups keep their '?'."""
+    setup, sep, punchline = line.partition("?")
+    if not sep:
+        return line + "?", MISSING_PUNCHLINE
+    return setup + "?", punchline
+
+
+# A line with something other than whitespace on it, matched from its start
+NONBLANK_LINE = re.compile(rb"^[ \t\r\f\v]*\S", re.M)
+
+
+def scan_offsets(data, start=0, end=None):
+    """Start offsets of the non-blank lines in data[start:end]; start must begin a line."""
+    end = len(data) if end is None else end
+    return array("Q", (m.start() for m in NONBLANK_LINE.finditer(data, start, end)))
+
+
+def read_line(data, start):
+    """The line starting at byte offset start, decoded and stripped."""
+    end = data.find(b"\n", start)
+    if end < 0:
+        end = len(data)
+    return data[start:end].decode("utf-8", "replace").strip()
+
+
+class JokeCorpus:
+    def __init__(self, path=JOKES_FILE, index_path=None, base=None, dedup=None, lazy=False):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._file = open(path, "rb")
+        st = os.fstat(self._file.fileno())
+        self.inode = st.st_ino
+        self.signature = (st.st_mtime_ns, st.st_size)
+        self.mm = None
+        if st.st_size:
+            self.mm = mmap.mmap(self._file.fileno(), st.st_size, access=mmap.ACCESS_READ)
+        # A copy, not a view: a rewrite in place changes every mapping of the file,
+        # so a later reload can only tell it from an append against these bytes
+        self.tail = self.mm[-TAIL_CHECK:] if self.mm is not None else b""
+
+        # Every non-blank line; offsets is what we serve, which dedup may thin out
+        self.all_offsets = self._load_index()
+        self.complete = True
+        # (inode, signature) of the corpus this one only appended lines to
+        self.appended_to = None
+        if self.all_offsets is None:
+            if base is not None:
+                self.all_offsets = self._appended_offsets(base)
+                if self.all_offsets is not None:
+                    self.appended_to = (base.inode, base.signature)
+            if self.all_offsets is None and lazy and self.mm is not None:
+                # Filled in by extend() with what scan_chunks() yields
+                self.all_offsets = array("Q")
+                self.complete = False
+            elif self.all_offsets is None:
+                self.all_offsets = scan_offsets(self.mm) if self.mm is not None else array("Q")
+            if self.complete:
+                self._save_index(self.all_offsets)
+
+        self.offsets = self.all_offsets
+        # Similarity threshold for joke_dedup, None to keep every line; needs the full index
+        self.dedup = dedup if self.complete else None
+        self.merged = []
+        if self.dedup is not None:
+            from joke_dedup import dedupe_corpus
+
+            self.offsets, self.merged = dedupe_corpus(self, dedup)
+
+    # ---------- reloading ----------
+    def changed(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return (st.st_ino, (st.st_mtime_ns, st.st_size)) != (self.inode, self.signature)
+
+    def reload(self):
+        """A corpus for the file as it is now. This one stays usable until closed."""
+        return JokeCorpus(self.path, self.index_path, base=self, dedup=self.dedup)
+
+    def extends(self, other):
+        """
+        True if joke i here is joke i in other for every i < len(other), so
+        anything keyed by other's joke numbers (a search index) stays right.
+        Only a reload that just appended lines, with dedup off, keeps them.
+        """
+        if other is self:
+            return True
+        return (self.dedup is None and other.dedup is None
+                and self.appended_to == (other.inode, other.signature))
+
+    def _appended_offsets(self, base):
+        """base's index plus the lines after its end, or None if the file was not just appended to."""
+        old = base.signature[1]
+        if base.inode != self.inode or self.signature[1] < old:
+            return None
+        if not old:
+            return scan_offsets(self.mm) if self.mm is not None else array("Q")
+        if self.mm[old - len(base.tail):old] != base.tail:
+            return None
+        # The old last line may have been unfinished, so rescan from its start
+        start = self.mm.rfind(b"\n", 0, old) + 1
+        offsets = base.all_offsets[:bisect_left(base.all_offsets, start)]
+        offsets.extend(scan_offsets(self.mm, start))
+        return offsets
+
+    # ---------- index file ----------
+    def _load_index(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) != INDEX_HEADER.size:
+                    return None
+                magic, order, mtime_ns, size, count = INDEX_HEADER.unpack(header)
+                if (magic, order, (mtime_ns, size)) != (INDEX_MAGIC, BYTE_ORDER, self.signature):
+                    return None
+                offsets = array("Q")
+                offsets.frombytes(f.read(count * offsets.itemsize))
+        except (OSError, ValueError):
+            return None
+        return offsets if len(offsets) == count else None
+
+    def _save_index(self, offsets):
+        """Best effort: a read-only directory just means scanning next time too."""
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".jokes-idx-", dir=directory)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, BYTE_ORDER, *self.signature,
+                                          len(offsets)))
+                offsets.tofile(f)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    # ---------- chunked loading ----------
+    def scan_chunks(self, chunk_bytes=1 << 20):
+        """
+        Offsets of the lines in each next chunk_bytes of a lazy corpus, as
+        arrays to pass to extend(). Nothing here changes the corpus, so it
+        can run on another thread while the owner serves what it has. The
+        index is saved once the whole file has been scanned.
+        """
+        if self.complete:
+            return
+        full = array("Q")
+        pos, size = 0, len(self.mm)
+        while pos < size:
+            end = self.mm.find(b"\n", min(pos + chunk_bytes, size))
+            end = size if end < 0 else end + 1
+            chunk = scan_offsets(self.mm, pos, end)
+            full.extend(chunk)
+            yield chunk
+            pos = end
+        self._save_index(full)
+
+    def extend(self, offsets):
+        self.all_offsets.extend(offsets)
+
+    # ---------- access ----------
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        """The i-th joke line, decoded and stripped."""
+        return self.line_at(self.offsets[i])
+
+    def line_at(self, start):
+        # Touching mapped pages past a truncated end is a SIGBUS, not an exception
+        if os.fstat(self._file.fileno()).st_size < len(self.mm):
+            raise StaleCorpusError(f"{self.path} was truncated")
+        return read_line(self.mm, start)
+
+    def joke(self, i):
+        return split_joke(self[i])
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CorpusWatcher:
+    """
+    Polls a corpus file by mtime and size from a daemon thread and builds
+    the reloaded corpus there. The owner collects it with take().
+    """
+    def __init__(self, corpus, interval=1.0):
+        self.corpus = corpus
+        self.interval = interval
+        self.updates = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="corpus-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.corpus.changed():
+                continue
+            try:
+                fresh = self.corpus.reload()
+            except (OSError, ValueError):
+                # Missing or unreadable mid-rewrite; try again next time
+                continue
+            self.corpus = fresh
+            self.updates.put(fresh)
+
+    def take(self):
+        """The newest corpus built since the last call, or None. Skipped ones are closed."""
+        latest = None
+        while True:
+            try:
+                fresh = self.updates.get_nowait()
+            except queue.Empty:
+                return latest
+            if latest is not None:
+                latest.close()
+            latest = fresh
+
+
+class CorpusLoader:
+    """
+    Opens a corpus on a daemon thread and reports on a queue, which the
+    owner drains from its own thread:
+
+        ("corpus", corpus)  serve this corpus from now on
+        ("lines", offsets)  more lines for the current corpus, for extend()
+        ("done", corpus)    fully loaded; with dedup, a second, deduplicated corpus
+        ("error", exc)      could not be loaded at all
+    """
+    def __init__(self, path=JOKES_FILE, dedup=None, chunk_bytes=1 << 20):
+        self.path = path
+        self.dedup = dedup
+        self.chunk_bytes = chunk_bytes
+        self.updates = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="corpus-loader", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        put = self.updates.put
+        try:
+            corpus = JokeCorpus(self.path, lazy=True)
+            chunks = corpus.scan_chunks(self.chunk_bytes)
+            # The owner gets the corpus with its first chunk already in place
+            corpus.extend(next(chunks, ()))
+            put(("corpus", corpus))
+            for chunk in chunks:
+                put(("lines", chunk))
+            if self.dedup is not None:
+                corpus = JokeCorpus(self.path, dedup=self.dedup)
+            put(("done", corpus))
+        except Exception as e:
+            put(("error", e))
@@ -0,0 +1,245 @@
+"""
+Near-duplicate detection for joke corpora, with MinHash and LSH.
+
+Each joke is normalised (lower case, words only) and cut into overlapping
+character shingles. A MinHash signature of num_perm values estimates how
+much two jokes' shingle sets overlap. It is a one-permutation MinHash:
+each shingle is hashed once and only lowers the minimum of the bin its
+hash falls in, and empty bins borrow from the next full one, so a line
+costs one hash per shingle instead of one per shingle and permutation.
+The signature is cut into bands, and
+jokes whose band values match land in the same bucket. Only jokes that
+share a bucket are compared, by exact shingle overlap, so the work grows
+roughly linearly with the corpus. Bands and rows are chosen so that the
+LSH threshold sits close to the requested similarity.
+
+Signatures are computed in a process pool, one chunk of lines per task.
+The earliest line of each group is kept. Which lines were merged into it
+is written to <file>.dedup.json, keyed by the file's mtime and size, so
+the next load reuses it:
+
+    python joke_dedup.py randomJokes.txt --threshold 0.7 --processes 8
+"""
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from joke_corpus import JOKES_FILE, JokeCorpus, read_line
+
+NUM_PERM = 64
+SHINGLE = 5
+CHUNK = 20000
+PRIME = (1 << 61) - 1
+DEDUP_SUFFIX = ".dedup.json"
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Fixed so every worker process hashes the same way
+_rng = random.Random(0x6A6F6B65)
+HASH_A, HASH_B = _rng.randrange(1, PRIME), _rng.randrange(PRIME)
+
+
+def shingles(text, k=SHINGLE):
+    text = " ".join(WORD_RE.findall(text.lower()))
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def similarity(a, b):
+    return jaccard(shingles(a), shingles(b))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def minhash(text, num_perm=NUM_PERM, k=SHINGLE):
+    sig = [PRIME] * num_perm
+    for s in shingles(text, k):
+        h = (zlib.crc32(s.encode("utf-8")) * HASH_A + HASH_B) % PRIME
+        b, v = divmod(h, PRIME // num_perm + 1)
+        if v < sig[b]:
+            sig[b] = v
+    # Densify: an empty bin takes the next full bin's value, tagged with the distance
+    for b in range(num_perm):
+        if sig[b] == PRIME:
+            for step in range(1, num_perm):
+                v = sig[(b + step) % num_perm]
+                if v != PRIME:
+                    sig[b] = v + step * PRIME
+                    break
+    return sig
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) with bands * rows == num_perm and (1/bands)**(1/rows) nearest threshold."""
+    pairs = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(pairs, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def band_keys(lines, bands, rows, k=SHINGLE):
+    """One int per (line, band), row-major. Int and tuple hashes are not salted."""
+    keys = array("q")
+    for line in lines:
+        sig = minhash(line, bands * rows, k)
+        keys.extend(hash(tuple(sig[i:i + rows])) for i in range(0, bands * rows, rows))
+    return keys
+
+
+def _chunk_keys(task):
+    path, offsets, bands, rows, k = task
+    starts = array("Q")
+    starts.frombytes(offsets)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = [read_line(mm, start) for start in starts]
+    return band_keys(lines, bands, rows, k).tobytes()
+
+
+class _Groups:
+    """Union-find over line numbers; the smallest number is always the root."""
+    def __init__(self, n):
+        self.parent = array("I", range(n))
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def find_duplicates(corpus, threshold=0.8, processes=None, num_perm=NUM_PERM, k=SHINGLE):
+    """[[kept, [merged, ...]], ...] over corpus.all_offsets, for groups of two or more."""
+    offsets = corpus.all_offsets
+    n = len(offsets)
+    bands, rows = lsh_params(threshold, num_perm)
+
+    if n <= CHUNK:
+        keys = band_keys((corpus.line_at(o) for o in offsets), bands, rows, k)
+    else:
+        tasks = [(corpus.path, offsets[i:i + CHUNK].tobytes(), bands, rows, k)
+                 for i in range(0, n, CHUNK)]
+        keys = array("q")
+        # Not fork: this runs on the loader's and watcher's threads inside the GUI
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=spawn) as pool:
+            for chunk in pool.map(_chunk_keys, tasks):
+                keys.frombytes(chunk)
+
+    # Lines in a busy bucket are compared again and again
+    shingled = lru_cache(maxsize=1 << 14)(lambda i: shingles(corpus.line_at(offsets[i]), k))
+    groups = _Groups(n)
+    checked = set()
+    # Lines with the same shingles as an earlier one, which stands in for them from then on
+    twins = bytearray(n)
+    for band in range(bands):
+        # One band at a time, so only n bucket entries are alive at once
+        buckets = {}
+        for i in range(n):
+            if twins[i]:
+                continue
+            members = buckets.setdefault(keys[i * bands + band], [])
+            # Every earlier member, not just the first: that one may be a false collision
+            for j in members:
+                if (j, i) in checked or groups.find(i) == groups.find(j):
+                    continue
+                checked.add((j, i))
+                sim = jaccard(shingled(j), shingled(i))
+                if sim >= threshold:
+                    groups.union(j, i)
+                if sim == 1.0:
+                    # j shares every bucket with i and meets the same lines in them
+                    twins[i] = 1
+                    break
+            if not twins[i]:
+                members.append(i)
+
+    members = {}
+    for i in range(n):
+        root = groups.find(i)
+        if root != i:
+            members.setdefault(root, []).append(i)
+    return [[root, merged] for root, merged in sorted(members.items())]
+
+
+def report_key(corpus, threshold):
+    return {"signature": list(corpus.signature), "threshold": threshold,
+            "num_perm": NUM_PERM, "shingle": SHINGLE}
+
+
+def dedupe_corpus(corpus, threshold=0.8, processes=None, report_path=None):
+    """(offsets to serve, merge groups), reusing the saved report when the file is unchanged."""
+    report_path = report_path or corpus.path + DEDUP_SUFFIX
+    key = report_key(corpus, threshold)
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("key") != key:
+            raise ValueError("stale dedup report")
+        merged = report["groups"]
+    except (OSError, ValueError, KeyError):
+        merged = find_duplicates(corpus, threshold, processes)
+        _write_report(report_path, key, merged)
+
+    dropped = {i for _, dups in merged for i in dups}
+    offsets = array("Q", (o for i, o in enumerate(corpus.all_offsets) if i not in dropped))
+    return offsets, merged
+
+
+def _write_report(path, key, merged):
+    """Best effort, like the offset index."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=".jokes-dedup-", dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "groups": merged}, f)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate jokes")
+    parser.add_argument("path", nargs="?", default=JOKES_FILE)
+    parser.add_argument("--threshold", type=float, default=0.8, help="shingle similarity, 0-1")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--show", type=int, default=10, help="groups to print")
+    args = parser.parse_args(argv)
+
+    with JokeCorpus(args.path) as corpus:
+        start = time.perf_counter()
+        merged = find_duplicates(corpus, args.threshold, args.processes)
+        elapsed = time.perf_counter() - start
+        _write_report(args.path + DEDUP_SUFFIX, report_key(corpus, args.threshold), merged)
+
+        dropped = sum(len(dups) for _, dups in merged)
+        print(f"{len(corpus.all_offsets)} lines, {len(merged)} groups, {dropped} merged "
+              f"in {elapsed:.2f}s (bands x rows = {lsh_params(args.threshold)})")
+        for root, dups in merged[:args.show]:
+            print(f"\n  kept   #{root}: {corpus.line_at(corpus.all_offsets[root])}")
+            for i in dups:
+                print(f"  merged #{i}: {corpus.line_at(corpus.all_offsets[i])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Keyword search over a JokeCorpus.
+
+JokeIndex is an inverted index from each word in a joke (setup and
+punchline alike) to the sorted joke numbers that contain it. The words are
+kept as one sorted list, and their posting lists are packed back to back
+in a single array('I') with an array('Q') of where each one starts. A word
+is a binary search, and because the words are sorted, all the words
+sharing a prefix own one contiguous run of that array, so a prefix query
+is a binary search too.
+
+Queries are words separated by spaces, all of which must match; a word
+ending in '*' matches as a prefix: "chicken road", "pizz*". The index is
+saved next to the joke file, keyed by its mtime and size like the offset
+index.
+"""
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+SEARCH_SUFFIX = ".search"
+
+# magic, byte order, mtime_ns, size, words, postings, vocabulary bytes
+INDEX_HEADER = struct.Struct("<3sc q q Q Q Q")
+INDEX_MAGIC = b"JSX"
+BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower())
+
+
+class JokeIndex:
+    def __init__(self, words, starts, postings, signature=None):
+        self.words = words
+        self.starts = starts
+        self.postings = postings
+        self.signature = signature
+
+    @classmethod
+    def build(cls, corpus):
+        lists = {}
+        for i in range(len(corpus)):
+            for word in set(tokenize(corpus[i])):
+                posting = lists.get(word)
+                if posting is None:
+                    posting = lists[word] = array("I")
+                posting.append(i)
+
+        words = sorted(lists)
+        starts = array("Q", [0])
+        postings = array("I")
+        for word in words:
+            postings.extend(lists.pop(word))
+            starts.append(len(postings))
+        return cls(words, starts, postings, corpus.signature)
+
+    @classmethod
+    def open(cls, corpus, path=None):
+        """The saved index for this corpus, or a freshly built (and saved) one."""
+        if path is None:
+            # Deduplication renumbers the jokes, so it gets an index of its own
+            dedup = "" if corpus.dedup is None else f".dedup{corpus.dedup:g}"
+            path = corpus.path + dedup + SEARCH_SUFFIX
+        index = cls.load(path, corpus.signature)
+        if index is None:
+            index = cls.build(corpus)
+            try:
+                index.save(path)
+            except OSError:
+                pass
+        return index
+
+    # ---------- lookups ----------
+    def _range(self, term):
+        """(first, last) positions in postings for a word or 'prefix*'."""
+        words = self.words
+        if term.endswith("*"):
+            prefix = term[:-1]
+            lo = bisect_left(words, prefix)
+            hi = bisect_left(words, prefix + "\uffff", lo)
+        else:
+            lo = bisect_left(words, term)
+            hi = lo + 1 if lo < len(words) and words[lo] == term else lo
+        return self.starts[lo], self.starts[hi]
+
+    def _matches(self, term):
+        first, last = self._range(term)
+        if term.endswith("*"):
+            # Several words can share a prefix, and a joke can have more than one
+            return sorted(set(self.postings[first:last]))
+        return self.postings[first:last]
+
+    def terms(self, query):
+        terms = []
+        for raw in query.lower().split():
+            words = WORD_RE.findall(raw)
+            if words and raw.endswith("*"):
+                words[-1] += "*"
+            terms.extend(words)
+        return terms
+
+    def count(self, term):
+        first, last = self._range(term)
+        return last - first
+
+    def search(self, query, limit=None):
+        """Joke numbers matching every term, ascending."""
+        terms = self.terms(query)
+        if not terms:
+            return []
+        # Start from the rarest term and binary-search the others
+        terms.sort(key=self.count)
+        result = self._matches(terms[0])
+        for term in terms[1:]:
+            if not result:
+                break
+            other = self._matches(term)
+            result = [i for i in result if _contains(other, i)]
+        result = list(result)
+        return result[:limit] if limit is not None else result
+
+    def random_match(self, query, rng=random):
+        """A random joke number matching query, or None."""
+        terms = self.terms(query)
+        if len(terms) == 1 and not terms[0].endswith("*"):
+            # One word lists each joke once: pick straight out of its postings, no list built
+            first, last = self._range(terms[0])
+            return self.postings[rng.randrange(first, last)] if last > first else None
+        matches = self.search(query)
+        return rng.choice(matches) if matches else None
+
+    # ---------- persistence ----------
+    def save(self, path):
+        vocab = "\n".join(self.words).encode("utf-8")
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=".jokes-search-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, BYTE_ORDER, *self.signature,
+                                          len(self.words), len(self.postings), len(vocab)))
+                f.write(vocab)
+                self.starts.tofile(f)
+                self.postings.tofile(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, signature):
+        try:
+            with open(path, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) != INDEX_HEADER.size:
+                    return None
+                magic, order, mtime_ns, size, n_words, n_postings, n_vocab = \
+                    INDEX_HEADER.unpack(header)
+                if (magic, order, (mtime_ns, size)) != (INDEX_MAGIC, BYTE_ORDER, signature):
+                    return None
+                vocab = f.read(n_vocab).decode("utf-8")
+                starts = array("Q")
+                starts.frombytes(f.read((n_words + 1) * starts.itemsize))
+                postings = array("I")
+                postings.frombytes(f.read(n_postings * postings.itemsize))
+        except (OSError, ValueError):
+            return None
+        words = vocab.split("\n") if n_words else []
+        if len(words) != n_words or len(starts) != n_words + 1 or len(postings) != n_postings:
+            return None
+        return cls(words, starts, postings, signature)
+
+
+def _contains(sorted_ids, i):
+    j = bisect_left(sorted_ids, i)
+    return j < len(sorted_ids) and sorted_ids[j] == i
@@ -0,0 +1,378 @@
+"""
+Local joke service.
+
+One process holds the corpus, its search index and the shuffle bags, and
+any number of kiosks ask it for jokes over a local socket instead of each
+loading randomJokes.txt. Like quiz_server it speaks line-delimited JSON,
+one request and one reply per line, on a connection that stays open:
+
+    {"cmd": "random"}                     any joke
+    {"cmd": "random", "topic": "pizz*"}   any joke matching a search
+    {"cmd": "next", "bag": "kiosk-1"}     every joke once before repeats, per bag
+    {"cmd": "search", "query": "chicken road", "limit": 10}
+    {"cmd": "stats"}
+
+Jokes come back as {"index": 17, "setup": "...?", "punchline": "..."}. The
+corpus is hot-reloaded by CorpusWatcher. The search index and a pre-split
+JokeStore are built on an executor thread, so neither stalls the event
+loop; until the store is ready, jokes are read from the mapped file.
+
+JokeClient is the blocking client JokeApp uses, with a small pool of
+keep-alive connections, and JokePrefetcher keeps the next joke fetched
+ahead of time. The load generator reports requests per second and latency
+percentiles:
+
+    python joke_server.py serve
+    python joke_server.py load --spawn --requests 50000 --clients 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+
+from joke_corpus import JOKES_FILE, CorpusWatcher, JokeCorpus, StaleCorpusError
+from joke_search import JokeIndex
+from joke_store import JokeStore
+from latency import add_server_args, open_connection, percentile, spawned_server
+from shuffle_bag import ShuffleBag
+
+SOCKET_PATH = "jokes.sock"
+DEFAULT_BAG = "default"
+LOAD_MIX = ("random", "next", "search")
+
+
+class JokeServer:
+    def __init__(self, path=JOKES_FILE, dedup=None):
+        self.corpus = JokeCorpus(path, dedup=dedup)
+        self.search = None
+        self.store = None
+        self.bags = {}
+        self.watcher = None
+        self.loop = None
+
+    # ---------- corpus ----------
+    def _index(self, corpus):
+        """Runs on an executor thread; the result is installed on the loop."""
+        try:
+            store = JokeStore.from_corpus(corpus)
+            index = JokeIndex.open(corpus)
+        except (OSError, ValueError, StaleCorpusError):
+            # Replaced or closed while we were reading it; the newer one gets its own
+            return
+        self.loop.call_soon_threadsafe(self._indexed, corpus, store, index)
+
+    def _indexed(self, corpus, store, index):
+        # On the loop thread, so _poll_corpus cannot swap the corpus in between
+        if corpus is self.corpus:
+            self.store = store
+            self.search = index
+
+    def _poll_corpus(self):
+        fresh = self.watcher.take()
+        if fresh is not None:
+            old, self.corpus = self.corpus, fresh
+            self.store = None
+            if not fresh.extends(old):
+                # Renumbered jokes: the old index would answer with the wrong ones
+                self.search = None
+            for bag in self.bags.values():
+                bag.resize(len(fresh))
+            old.close()
+            self.loop.run_in_executor(None, self._index, fresh)
+        self.loop.call_later(self.watcher.interval, self._poll_corpus)
+
+    def _joke(self, index):
+        if index is None:
+            return {"index": None, "setup": None, "punchline": None}
+        setup, punchline = (self.store or self.corpus).joke(index)
+        return {"index": index, "setup": setup, "punchline": punchline}
+
+    # ---------- requests ----------
+    def random_joke(self, topic=None):
+        if topic:
+            if self.search is None:
+                raise ValueError("Search index is still being built")
+            index = self.search.random_match(topic)
+            if index is not None and index >= len(self.corpus):
+                index = None
+            return self._joke(index)
+        if not len(self.corpus):
+            return self._joke(None)
+        return self._joke(random.randrange(len(self.corpus)))
+
+    def next_joke(self, name=DEFAULT_BAG):
+        bag = self.bags.get(name)
+        if bag is None:
+            bag = self.bags[name] = ShuffleBag(len(self.corpus))
+        return self._joke(bag.draw() if len(bag) else None)
+
+    def search_jokes(self, query, limit=10):
+        if self.search is None:
+            raise ValueError("Search index is still being built")
+        matches = [i for i in self.search.search(query) if i < len(self.corpus)]
+        return {"count": len(matches), "jokes": [self._joke(i) for i in matches[:int(limit)]]}
+
+    def dispatch(self, msg):
+        cmd = msg.get("cmd")
+        if cmd == "random":
+            return self.random_joke(msg.get("topic"))
+        if cmd == "next":
+            return self.next_joke(str(msg.get("bag", DEFAULT_BAG)))
+        if cmd == "search":
+            return self.search_jokes(str(msg.get("query", "")), msg.get("limit", 10))
+        if cmd == "stats":
+            return {"jokes": len(self.corpus), "indexed": self.search is not None,
+                    "bags": len(self.bags)}
+        raise ValueError(f"Unknown command: {cmd}")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.dispatch(json.loads(line))
+                except (ValueError, AttributeError, TypeError, StaleCorpusError) as e:
+                    reply = {"error": str(e)}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=SOCKET_PATH, port=None):
+        self.loop = asyncio.get_running_loop()
+        self.loop.run_in_executor(None, self._index, self.corpus)
+        self.watcher = CorpusWatcher(self.corpus).start()
+        self.loop.call_later(self.watcher.interval, self._poll_corpus)
+
+        if port is not None:
+            server = await asyncio.start_server(self.handle_client, "127.0.0.1", port)
+        else:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle_client, path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.watcher.stop()
+
+
+# ---------- blocking client ----------
+class JokeClient:
+    """
+    Request/reply over a pool of up to size keep-alive connections. Safe to
+    share between threads; each request has a connection to itself.
+    """
+    def __init__(self, path=SOCKET_PATH, port=None, size=4, timeout=2.0):
+        self.path = path
+        self.port = port
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        if self.port is not None:
+            sock = socket.create_connection(("127.0.0.1", self.port), self.timeout)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+        return sock, sock.makefile("rb")
+
+    @staticmethod
+    def _close(conn):
+        conn[1].close()
+        conn[0].close()
+
+    def _exchange(self, conn, data):
+        conn[0].sendall(data)
+        line = conn[1].readline()
+        if not line:
+            raise ConnectionError("Joke server closed the connection")
+        return line
+
+    def request(self, msg):
+        data = json.dumps(msg).encode("utf-8") + b"\n"
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+            if conn is not None:
+                try:
+                    line = self._exchange(conn, data)
+                except ConnectionError:
+                    # An idle connection the server dropped, e.g. after a restart
+                    self._close(conn)
+                    conn = None
+                except BaseException:
+                    # A timeout may mean the server got the request; sending it again
+                    # would draw twice from a bag
+                    self._close(conn)
+                    raise
+            if conn is None:
+                conn = self._connect()
+                try:
+                    line = self._exchange(conn, data)
+                except BaseException:
+                    self._close(conn)
+                    raise
+            self._idle.put(conn)
+        return json.loads(line)
+
+    def close(self):
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class JokePrefetcher:
+    """Fetches the next few jokes from a bag on a daemon thread, so take() rarely waits on the socket."""
+    def __init__(self, client, bag=DEFAULT_BAG, depth=2, retry_seconds=1.0):
+        self.client = client
+        self.bag = bag
+        self.retry_seconds = retry_seconds
+        self.ready = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="joke-prefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                reply = self.client.request({"cmd": "next", "bag": self.bag})
+            except (OSError, ValueError) as e:
+                reply = {"error": str(e)}
+            while not self._stop.is_set():
+                try:
+                    self.ready.put(reply, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+            if "error" in reply:
+                self._stop.wait(self.retry_seconds)
+
+    def take(self):
+        """The next prefetched reply, or None if none has arrived yet."""
+        try:
+            return self.ready.get_nowait()
+        except queue.Empty:
+            return None
+
+
+# ---------- load generator ----------
+async def _client(path, port, n, mix, queries, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await open_connection(path, port)
+    errors = 0
+    try:
+        for _ in range(n):
+            cmd = rng.choice(mix)
+            if cmd == "search":
+                msg = {"cmd": "search", "query": rng.choice(queries), "limit": 5}
+            else:
+                msg = {"cmd": cmd, "bag": f"load-{seed}"}
+            sent = time.perf_counter()
+            writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent)
+            errors += "error" in reply
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load(path=SOCKET_PATH, port=None, requests=10000, clients=50,
+                   mix=LOAD_MIX, queries=("why", "chicken", "what*", "dog")):
+    latencies = []
+    per_client = [requests // clients + (1 if i < requests % clients else 0)
+                  for i in range(clients)]
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(_client(path, port, n, mix, queries, latencies, i)
+                                    for i, n in enumerate(per_client) if n))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "clients": clients,
+        "mix": list(mix),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local joke service")
+    serve, load = add_server_args(parser, SOCKET_PATH)
+    for p in (serve, load):
+        p.add_argument("--jokes", default=JOKES_FILE)
+        p.add_argument("--dedup", type=float, default=None,
+                       help="merge near-duplicate jokes above this similarity")
+    load.add_argument("--requests", type=int, default=10000)
+    load.add_argument("--clients", type=int, default=50)
+    load.add_argument("--mix", nargs="+", default=list(LOAD_MIX), choices=LOAD_MIX)
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        try:
+            asyncio.run(JokeServer(args.jokes, args.dedup).serve(args.socket, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    def load_test():
+        return asyncio.run(run_load(args.socket, args.port, args.requests, args.clients,
+                                    tuple(args.mix)))
+
+    if not args.spawn:
+        stats = load_test()
+    else:
+        cmd = ["--socket", args.socket, "--jokes", args.jokes]
+        if args.port is not None:
+            cmd += ["--port", str(args.port)]
+        if args.dedup is not None:
+            cmd += ["--dedup", str(args.dedup)]
+        client = JokeClient(args.socket, args.port)
+
+        def indexed():
+            # Ready once the search index is built, so the run measures steady state
+            return client.request({"cmd": "stats"}).get("indexed")
+
+        try:
+            with spawned_server(__file__, cmd, indexed, timeout=30.0):
+                stats = load_test()
+        finally:
+            client.close()
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compact, pre-split joke records.
+
+JokeStore parses each joke line once. Setups (with their '?') and
+punchlines go into one UTF-8 blob, back to back, with an array('Q') of
+where each setup and each punchline starts, interleaved, and an
+array('B') of flags. A line without a '?' is flagged instead of having
+"?Oops! Punchline missing." glued onto it, and every such joke shares the
+one MISSING_PUNCHLINE string. A draw is two slices of the blob and two
+decodes, with no splitting or concatenation.
+
+Per joke that is its UTF-8 bytes plus 17 bytes of index, against a
+Python str object per line in a list (about 50 bytes of header each,
+four bytes per character once a line has an emoji in it). The joke
+server draws from one; JokeApp keeps drawing from the memory-mapped
+JokeCorpus, whose memory stays flat however large the file grows.
+"""
+from array import array
+
+from joke_corpus import MISSING_PUNCHLINE
+
+MISSING = 1
+
+
+class JokeStore:
+    def __init__(self):
+        self.blob = b""
+        # Joke i is setup blob[bounds[2i]:bounds[2i+1]], punchline up to bounds[2i+2]
+        self.bounds = array("Q", [0])
+        self.flags = array("B")
+
+    @classmethod
+    def from_lines(cls, lines):
+        store = cls()
+        blob = bytearray()
+        bounds, flags = store.bounds, store.flags
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            setup, sep, punchline = line.partition("?")
+            if sep:
+                blob += (setup + "?").encode("utf-8")
+                bounds.append(len(blob))
+                blob += punchline.encode("utf-8")
+                flags.append(0)
+            else:
+                blob += (line + "?").encode("utf-8")
+                bounds.append(len(blob))
+                flags.append(MISSING)
+            bounds.append(len(blob))
+        store.blob = bytes(blob)
+        return store
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        return cls.from_lines(corpus[i] for i in range(len(corpus)))
+
+    def __len__(self):
+        return len(self.flags)
+
+    def joke(self, i):
+        """(setup, punchline) for joke i."""
+        start, split, end = self.bounds[2 * i:2 * i + 3]
+        blob = self.blob
+        if split == end and self.flags[i] & MISSING:
+            return blob[start:split].decode(), MISSING_PUNCHLINE
+        return blob[start:split].decode(), blob[split:end].decode()
+
+    def missing(self, i):
+        return bool(self.flags[i] & MISSING)
+
+    def nbytes(self):
+        """Bytes held by the blob and the arrays."""
+        return len(self.blob) + self.bounds.itemsize * len(self.bounds) + len(self.flags)
@@ -0,0 +1,109 @@
+"""
+Latency measurement shared by the load generators: small histograms that
+are cheap to fill, merge and ship between processes, exact percentiles of
+a sorted sample, and the scaffolding the serve/load command lines of
+quiz_server and joke_server have in common.
+"""
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+
+class Histogram:
+    """Latency counts in power-of-two microsecond buckets; cheap to merge across processes."""
+    def __init__(self, counts=None):
+        self.counts = counts or {}
+
+    def add(self, seconds):
+        bucket = max(0, int(seconds * 1e6)).bit_length()
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+
+    def merge(self, other):
+        for bucket, n in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + n
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def max(self):
+        """Upper bound in ms of the highest non-empty bucket."""
+        return (1 << max(self.counts)) / 1000 if self.counts else 0.0
+
+    def percentile(self, p):
+        """Upper bound in ms of the bucket holding the p-th percentile."""
+        total = self.total()
+        if not total:
+            return 0.0
+        rank = math.ceil(p / 100 * total)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return (1 << bucket) / 1000
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.total(),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": {str((1 << b) / 1000): n for b, n in sorted(self.counts.items())},
+        }
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+# ---------- local servers ----------
+async def open_connection(path, port):
+    """Streams to a local server: TCP on 127.0.0.1 when port is set, else the Unix socket."""
+    if port is not None:
+        return await asyncio.open_connection("127.0.0.1", port)
+    return await asyncio.open_unix_connection(path)
+
+
+def add_server_args(parser, socket_path):
+    """serve and load subcommands that both take --socket and --port; returns (serve, load)."""
+    sub = parser.add_subparsers(dest="mode", required=True)
+    for name in ("serve", "load"):
+        p = sub.add_parser(name)
+        p.add_argument("--socket", default=socket_path)
+        p.add_argument("--port", type=int, default=None)
+    load = sub.choices["load"]
+    load.add_argument("--spawn", action="store_true", help="start a server subprocess for the run")
+    return sub.choices["serve"], load
+
+
+@contextmanager
+def spawned_server(script, args, ready, timeout=10.0):
+    """
+    Run "python script serve args..." around a load test. ready() is polled
+    until it returns true; OSError counts as not yet.
+    """
+    proc = subprocess.Popen([sys.executable, os.path.abspath(script), "serve", *args])
+    try:
+        end = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{os.path.basename(script)} exited with {proc.returncode}")
+            try:
+                if ready():
+                    break
+            except OSError:
+                pass
+            if time.monotonic() >= end:
+                raise RuntimeError(f"{os.path.basename(script)} did not start")
+            time.sleep(0.05)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait()
@@ -0,0 +1,501 @@
+import heapq
+import json
+import os
+import tempfile
+import time
+from array import array
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single process only
+    fcntl = None
+
+SCORES_FILE = "scores.json"
+SCORES_LOG = "scores.log"
+LEADERBOARD_SIZE = 5
+
+SEQ_BITS = 40
+SEQ_MASK = (1 << SEQ_BITS) - 1
+# Largest |score| whose key still fits the int64 arrays
+MAX_SCORE = (1 << (63 - SEQ_BITS)) - 1
+
+
+def rank_key(score, seq):
+    """
+    Pack a score and its save number into one int that sorts best first:
+    higher score first, then the earlier save.
+    """
+    if not -MAX_SCORE <= score <= MAX_SCORE:
+        raise ValueError(f"Score out of range: {score}")
+    return (-int(score) << SEQ_BITS) | seq
+
+
+def key_score(key):
+    return -(key >> SEQ_BITS)
+
+
+def key_seq(key):
+    return key & SEQ_MASK
+
+
+def valid_entry(entry):
+    """True for a saved score we can index; anything else in a log is skipped."""
+    return (isinstance(entry, dict) and isinstance(entry.get("name"), str)
+            and isinstance(entry.get("difficulty"), str)
+            and isinstance(entry.get("score"), int) and not isinstance(entry["score"], bool)
+            and -MAX_SCORE <= entry["score"] <= MAX_SCORE
+            and isinstance(entry.get("date", ""), str))
+
+
+class SortedKeys:
+    """
+    Sorted multiset of ints kept as a list of short sorted array('q') chunks.
+
+    A Fenwick tree over the chunk lengths turns "how many keys come before
+    this one" and "the key at position i" into O(log n) lookups, and an
+    insert only shifts one chunk instead of the whole array.
+    """
+    LOAD = 1024
+
+    def __init__(self, sorted_keys=()):
+        keys = array("q", sorted_keys)
+        self.chunks = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self.maxes = [c[-1] for c in self.chunks]
+        self.size = len(keys)
+        self._build_tree()
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk
+
+    def _build_tree(self):
+        n = len(self.chunks)
+        tree = [0] * (n + 1)
+        for i, chunk in enumerate(self.chunks, 1):
+            tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _prefix(self, i):
+        """Number of keys in chunks[:i]."""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, pos):
+        """(chunk index, offset in chunk) of the key at position pos."""
+        i = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = i + step
+            if nxt < len(self.tree) and self.tree[nxt] <= pos:
+                i = nxt
+                pos -= self.tree[nxt]
+            step >>= 1
+        return i, pos
+
+    def add(self, key):
+        self.size += 1
+        if not self.chunks:
+            self.chunks.append(array("q", [key]))
+            self.maxes.append(key)
+            self._build_tree()
+            return
+
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            i -= 1
+        chunk = self.chunks[i]
+        insort(chunk, key)
+        self.maxes[i] = chunk[-1]
+
+        if len(chunk) > 2 * self.LOAD:
+            self.chunks[i:i + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self.maxes[i:i + 1] = [self.chunks[i][-1], chunk[-1]]
+            self._build_tree()
+        else:
+            j = i + 1
+            while j < len(self.tree):
+                self.tree[j] += 1
+                j += j & -j
+
+    def bisect_left(self, key):
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return self.size
+        return self._prefix(i) + bisect_left(self.chunks[i], key)
+
+    def slice(self, start, stop):
+        stop = min(stop, self.size)
+        out = array("q")
+        if start >= stop:
+            return out
+        i, offset = self._locate(start)
+        while len(out) < stop - start:
+            out.extend(self.chunks[i][offset:offset + (stop - start - len(out))])
+            i += 1
+            offset = 0
+        return out
+
+
+class ScoreIndex:
+    """
+    Ordered index over every saved score.
+
+    Keeps one SortedKeys of rank keys for all scores and one per
+    difficulty, plus each player's best key per difficulty, so rank and
+    page lookups are a bisect or a slice. Entries themselves stay in the
+    log; the index only remembers where each line starts.
+    """
+    def __init__(self):
+        self.offsets = array("Q")
+        self.all_keys = SortedKeys()
+        self.by_difficulty = {}
+        self.best = {}
+        self._pending = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def begin_bulk(self):
+        """Collect keys unsorted (log replay) until end_bulk() sorts them once."""
+        self._pending = ([], {})
+
+    def end_bulk(self):
+        all_keys, by_diff = self._pending
+        self._pending = None
+        all_keys.extend(self.all_keys)
+        self.all_keys = SortedKeys(sorted(all_keys))
+        for diff, keys in by_diff.items():
+            keys.extend(self.by_difficulty.get(diff, ()))
+            self.by_difficulty[diff] = SortedKeys(sorted(keys))
+
+    def add(self, name, score, difficulty, offset):
+        seq = len(self.offsets)
+        key = rank_key(score, seq)
+        self.offsets.append(offset)
+
+        if self._pending is not None:
+            all_keys, by_diff = self._pending
+            all_keys.append(key)
+            by_diff.setdefault(difficulty, []).append(key)
+        else:
+            self.all_keys.add(key)
+            self.by_difficulty.setdefault(difficulty, SortedKeys()).add(key)
+
+        bests = self.best.setdefault(name, {})
+        if difficulty not in bests or key < bests[difficulty]:
+            bests[difficulty] = key
+        return seq
+
+    def rank_of(self, name, difficulty):
+        key = self.best.get(name, {}).get(difficulty)
+        if key is None:
+            return None
+        return self.by_difficulty[difficulty].bisect_left(key) + 1
+
+    def personal_best(self, name):
+        return {diff: key_score(key) for diff, key in self.best.get(name, {}).items()}
+
+    def page_keys(self, offset, limit, difficulty=None):
+        keys = self.all_keys if difficulty is None else self.by_difficulty.get(difficulty)
+        if keys is None:
+            return array("q")
+        return keys.slice(offset, offset + limit)
+
+
+class Leaderboard:
+    """
+    Append-only score log with a bounded top-K heap per difficulty.
+
+    Every saved score is one JSON line appended to the log, so history is
+    never thrown away. The log is replayed once at startup; after that a
+    save costs one small append plus O(log K) heap work. Appends are flushed
+    to the OS straight away and fsync'd in batches. A ScoreIndex over the
+    whole history answers rank, personal-best and paging queries.
+
+    Several processes can share one log. Appends happen under an advisory
+    fcntl lock on a side file, and each writer first reads whatever the
+    others appended, so nobody loses entries. Readers only stat the log and
+    read the new tail when its size or mtime changed. Whole-file rewrites
+    (legacy import, compact()) go to a temp file that is renamed into place.
+    """
+    def __init__(self, filename=SCORES_LOG, size=LEADERBOARD_SIZE,
+                 fsync_every=32, fsync_interval=1.0, legacy_file=SCORES_FILE, listeners=()):
+        self.filename = filename
+        self.lock_file = filename + ".lock"
+        self.size = size
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._lock_fd = None
+        # Time spent waiting for other processes' locks, for contention reports
+        self.lock_wait_seconds = 0.0
+        self.lock_waits = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # Objects with add(entry) and clear(), fed every entry as it is indexed
+        self.listeners = list(listeners)
+        self._reset()
+
+        if not os.path.exists(self.filename) and legacy_file and os.path.exists(legacy_file):
+            with self._locked():
+                if not os.path.exists(self.filename):
+                    self._import_legacy(legacy_file)
+        self.refresh()
+
+    @property
+    def count(self):
+        return len(self.index)
+
+    def _reset(self):
+        self.heaps = {}
+        self.index = ScoreIndex()
+        self._end = 0
+        self._sig = None
+        for listener in self.listeners:
+            listener.clear()
+
+    def attach(self, listener):
+        """Feed a listener the whole history now and every new entry after."""
+        self.listeners.append(listener)
+        self._reset()
+        self.refresh()
+
+    # ---------- locking ----------
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        start = time.perf_counter()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self.lock_wait_seconds += time.perf_counter() - start
+        self.lock_waits += 1
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # ---------- reading ----------
+    def refresh(self):
+        """Pick up entries other processes appended since the last look."""
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            if self._sig is not None:
+                self._reset()
+            return
+        sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if sig == self._sig:
+            return
+        if self._sig is None or sig[0] != self._sig[0] or sig[1] < self._end:
+            # Replaced or truncated: replay from scratch
+            self._reset()
+            self.index.begin_bulk()
+            try:
+                self._read_from(0)
+            finally:
+                self.index.end_bulk()
+        else:
+            self._read_from(self._end)
+
+    def _read_from(self, start):
+        with open(self.filename, "rb") as f:
+            st = os.fstat(f.fileno())
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Being written right now, or torn by a crashed writer
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if valid_entry(entry):
+                    self._index(entry, offset)
+                offset += len(line)
+        self._end = offset
+        self._sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_entry(self, f, seq):
+        f.seek(self.index.offsets[seq])
+        return json.loads(f.readline())
+
+    # ---------- writing ----------
+    def _import_legacy(self, legacy_file):
+        """Seed the log from an old scores.json written by earlier versions."""
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, list):
+            return
+        entries = [e for e in entries if valid_entry(e)]
+        entries.sort(key=lambda e: str(e.get("date", "")))
+        self._write_atomic(json.dumps(e, separators=(",", ":")).encode("utf-8") + b"\n"
+                           for e in entries)
+
+    def _write_atomic(self, lines):
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp = tempfile.mkstemp(prefix=".scores-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            dfd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+
+    def _open_log(self):
+        """Append handle for the current log, reopened if it was replaced."""
+        if self._file is not None:
+            try:
+                same = os.fstat(self._file.fileno()).st_ino == os.stat(self.filename).st_ino
+            except FileNotFoundError:
+                same = False
+            if not same:
+                self._close_log()
+        if self._file is None:
+            self._file = open(self.filename, "ab")
+        return self._file
+
+    def _append(self, entry):
+        data = json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._locked():
+            f = self._open_log()
+            self.refresh()
+            end = os.fstat(f.fileno()).st_size
+            if end > self._end:
+                # We hold the lock, so a partial last line is torn, not in
+                # flight. Fence it off so it cannot swallow this entry.
+                f.write(b"\n")
+                end += 1
+            f.write(data)
+            f.flush()
+            st = os.fstat(f.fileno())
+            self._end = end + len(data)
+            self._sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+            self._unsynced += 1
+
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self.flush()
+        return end
+
+    def flush(self):
+        """fsync any appends that are still only in the OS page cache."""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """Rewrite the log without torn, unreadable or incomplete lines."""
+        with self._locked():
+            self.flush()
+            self._reset()
+            good = []
+            if os.path.exists(self.filename):
+                with open(self.filename, "rb") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not valid_entry(entry):
+                            continue
+                        good.append(line if line.endswith(b"\n") else line + b"\n")
+            self._write_atomic(good)
+            self.refresh()
+
+    def _close_log(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_log()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    # ---------- top-K ----------
+    def _index(self, entry, offset):
+        seq = self.index.add(entry["name"], entry["score"], entry["difficulty"], offset)
+        # Min-heap ordered worst first: lowest score, then the latest save
+        item = (entry["score"], -seq, entry)
+        heap = self.heaps.setdefault(entry["difficulty"], [])
+        if len(heap) < self.size:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+        for listener in self.listeners:
+            listener.add(entry)
+
+    def add_score(self, name, score, difficulty):
+        # Checked before the append, so a bad score never reaches the log
+        rank_key(score, 0)
+        entry = {"name": name, "score": score, "difficulty": difficulty,
+                 "date": datetime.utcnow().isoformat() + "Z"}
+        offset = self._append(entry)
+        self._index(entry, offset)
+
+    def top_scores(self, difficulty=None):
+        self.refresh()
+        if difficulty is None:
+            items = [item for heap in self.heaps.values() for item in heap]
+        else:
+            items = list(self.heaps.get(difficulty, []))
+        items.sort(key=lambda item: (-item[0], -item[1]))
+        return [dict(item[2]) for item in items[:self.size]]
+
+    # ---------- rank queries ----------
+    def rank_of(self, name, difficulty):
+        """1-based rank of the player's best score in a difficulty, or None."""
+        self.refresh()
+        return self.index.rank_of(name, difficulty)
+
+    def personal_best(self, name):
+        """The player's best score per difficulty, e.g. {"Easy": 9}."""
+        self.refresh()
+        return self.index.personal_best(name)
+
+    def page(self, offset=0, limit=LEADERBOARD_SIZE, difficulty=None):
+        """Entries ranked offset+1 .. offset+limit over the full history."""
+        self.refresh()
+        keys = self.index.page_keys(offset, limit, difficulty)
+        if not keys:
+            return []
+        with open(self.filename, "rb") as f:
+            entries = []
+            for rank, key in enumerate(keys, offset + 1):
+                entry = self._read_entry(f, key_seq(key))
+                entry["rank"] = rank
+                entries.append(entry)
+        return entries
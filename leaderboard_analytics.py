@@ -0,0 +1,144 @@
+"""
+Aggregate views over the full score history.
+
+LeaderboardAnalytics is a Leaderboard listener: it sees every entry once,
+during log replay and then on each add_score (including scores other
+processes appended), and keeps materialized aggregates per difficulty and
+per difficulty and day. Dashboards read those directly and never rescan
+the log.
+
+    lb = Leaderboard()
+    stats = LeaderboardAnalytics()
+    lb.attach(stats)
+    stats.summary("Hard")
+    stats.percentile_rank(8, "Hard")
+"""
+import math
+from array import array
+
+
+class ScoreStats:
+    """
+    Count, Welford mean/variance and a dense histogram of integer scores.
+    Percentile ranks are prefix sums over the histogram array.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = 0
+        self.counts = array("q")
+
+    def add(self, score):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+
+        bucket = int(score)
+        if not self.counts:
+            self.low = bucket
+            self.counts.append(0)
+        elif bucket < self.low:
+            self.counts[0:0] = array("q", bytes(8 * (self.low - bucket)))
+            self.low = bucket
+        elif bucket >= self.low + len(self.counts):
+            grow = bucket - self.low - len(self.counts) + 1
+            self.counts.extend(array("q", bytes(8 * grow)))
+        self.counts[bucket - self.low] += 1
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def histogram(self):
+        return {self.low + i: n for i, n in enumerate(self.counts) if n}
+
+    def percentile_rank(self, score):
+        """Share of scores below this one, counting ties as half, in percent."""
+        if not self.count:
+            return None
+        i = int(score) - self.low
+        if i < 0:
+            return 0.0
+        if i >= len(self.counts):
+            return 100.0
+        below = sum(self.counts[:i])
+        return 100.0 * (below + 0.5 * self.counts[i]) / self.count
+
+    def percentile(self, p):
+        """Smallest score with at least p percent of scores at or below it."""
+        if not self.count:
+            return None
+        target = math.ceil(p / 100 * self.count)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= max(1, target):
+                return self.low + i
+        return self.low + len(self.counts) - 1
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 4),
+            "variance": round(self.variance, 4),
+            "stdev": round(self.stdev, 4),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "histogram": self.histogram(),
+        }
+
+
+class LeaderboardAnalytics:
+    def __init__(self):
+        self.clear()
+
+    # ---------- listener ----------
+    def clear(self):
+        self.overall = ScoreStats()
+        self.by_difficulty = {}
+        self.by_day = {}
+
+    def add(self, entry):
+        score = entry["score"]
+        difficulty = entry["difficulty"]
+        day = entry.get("date", "")[:10]
+
+        self.overall.add(score)
+        stats = self.by_difficulty.get(difficulty)
+        if stats is None:
+            stats = self.by_difficulty[difficulty] = ScoreStats()
+        stats.add(score)
+        stats = self.by_day.get((difficulty, day))
+        if stats is None:
+            stats = self.by_day[(difficulty, day)] = ScoreStats()
+        stats.add(score)
+
+    # ---------- queries ----------
+    def stats(self, difficulty=None, day=None):
+        if difficulty is None:
+            return self.overall
+        if day is None:
+            return self.by_difficulty.get(difficulty, ScoreStats())
+        return self.by_day.get((difficulty, day), ScoreStats())
+
+    def summary(self, difficulty=None, day=None):
+        return self.stats(difficulty, day).summary()
+
+    def histogram(self, difficulty=None, day=None):
+        return self.stats(difficulty, day).histogram()
+
+    def percentile_rank(self, score, difficulty=None, day=None):
+        return self.stats(difficulty, day).percentile_rank(score)
+
+    def days(self, difficulty):
+        return sorted(day for diff, day in self.by_day if diff == difficulty)
+
+    def daily(self, difficulty):
+        """[(day, summary)] for one difficulty, oldest first."""
+        return [(day, self.by_day[(difficulty, day)].summary()) for day in self.days(difficulty)]
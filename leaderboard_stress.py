@@ -0,0 +1,93 @@
+"""
+Stress test for shared leaderboard logs.
+
+Starts many writer processes that all save scores to the same log at once,
+with a reader polling top_scores() alongside them, then checks that every
+entry made it to disk exactly once and that a fresh Leaderboard agrees.
+
+    python leaderboard_stress.py --writers 16 --scores 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from multiprocessing import Process
+
+from leaderboard import Leaderboard
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+def writer(path, wid, n, fsync_every):
+    lb = Leaderboard(path, fsync_every=fsync_every, legacy_file=None)
+    rng = random.Random(wid)
+    for i in range(n):
+        lb.add_score(f"w{wid}-{i}", rng.randint(0, 10), rng.choice(DIFFICULTIES))
+    lb.close()
+
+
+def reader(path, stop_after):
+    lb = Leaderboard(path, legacy_file=None)
+    end = time.monotonic() + stop_after
+    while time.monotonic() < end:
+        lb.top_scores()
+        lb.rank_of("w0-0", "Easy")
+    lb.close()
+
+
+def run(writers, scores, fsync_every, path=None):
+    tmpdir = None
+    if path is None:
+        tmpdir = tempfile.mkdtemp(prefix="lb-stress-")
+        path = os.path.join(tmpdir, "scores.log")
+
+    start = time.perf_counter()
+    procs = [Process(target=writer, args=(path, w, scores, fsync_every)) for w in range(writers)]
+    procs.append(Process(target=reader, args=(path, 1.0)))
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    failures = [p.exitcode for p in procs if p.exitcode != 0]
+    with open(path, "rb") as f:
+        names = [json.loads(line)["name"] for line in f]
+    expected = {f"w{w}-{i}" for w in range(writers) for i in range(scores)}
+    fresh = Leaderboard(path, legacy_file=None)
+
+    report = {
+        "writers": writers,
+        "scores_per_writer": scores,
+        "seconds": round(elapsed, 3),
+        "saves_per_sec": round(writers * scores / elapsed, 1),
+        "lines": len(names),
+        "missing": len(expected - set(names)),
+        "duplicates": len(names) - len(set(names)),
+        "replayed": fresh.count,
+        "failed_processes": len(failures),
+    }
+    fresh.close()
+    report["ok"] = (not failures and report["missing"] == 0 and report["duplicates"] == 0
+                    and report["lines"] == len(expected) == report["replayed"])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent leaderboard writer stress test")
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--scores", type=int, default=500)
+    parser.add_argument("--fsync-every", type=int, default=32)
+    parser.add_argument("--file", default=None, help="log to use (default: a temp file)")
+    args = parser.parse_args(argv)
+
+    report = run(args.writers, args.scores, args.fsync_every, args.file)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+import csv
+import math
+import random
+import re
+import time
+from array import array
+from itertools import islice
+
+MAX_QUESTIONS = 10
+
+DIFFICULTY_SETTINGS = {
+    "Easy": {"operators": ["+", "-", "*"], "min": 1, "max": 10, "allow_decimal": False, "timer": 30},
+    "Medium": {"operators": ["+", "-", "*", "/"], "min": 1, "max": 50, "allow_decimal": False, "timer": 20},
+    "Hard": {"operators": ["+", "-", "*", "/"], "min": -50, "max": 100, "allow_decimal": True, "timer": 15}
+}
+
+def safe_calculate(n1, op, n2):
+    if op == "+": return n1 + n2
+    if op == "-": return n1 - n2
+    if op == "*": return n1 * n2
+    if op == "/": return n1 / n2
+    raise ValueError("Invalid operator")
+
+
+def format_answer(ans, allow_decimal):
+    return round(float(ans), 2) if allow_decimal else int(round(ans))
+
+
+def bulk_answers(n1, ops, n2, allow_decimal):
+    """format_answer(safe_calculate(...)) for whole columns at once."""
+    raw = map(safe_calculate, n1, ops, n2)
+    if allow_decimal:
+        return [round(float(x), 2) for x in raw]
+    return [int(round(x)) for x in raw]
+
+
+# Plain decimal numbers, which is nearly every typed answer
+NUMBER_RE = re.compile(r"\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*")
+# Other spellings float() accepts: 1_000, inf, nan, non-ASCII digits
+MAYBE_NUMBER_RE = re.compile(r"[_iInN]|[^\x00-\x7f]")
+
+
+def parse_answer_column(texts):
+    """
+    float() of each typed answer, or None where it is blank or not a number.
+    Only unusual spellings pay for a try/except; plain garbage is rejected
+    by the regex.
+    """
+    match = NUMBER_RE.fullmatch
+    maybe = MAYBE_NUMBER_RE.search
+    out = []
+    for t in texts:
+        if match(t):
+            out.append(float(t))
+        elif t.strip() and maybe(t):
+            try:
+                out.append(float(t))
+            except ValueError:
+                out.append(None)
+        else:
+            out.append(None)
+    return out
+
+class Question:
+    __slots__ = ("n1", "op", "n2", "allow_decimal", "answer")
+
+    def __init__(self, n1, op, n2, allow_decimal=False, answer=None):
+        self.n1 = n1
+        self.op = op
+        self.n2 = n2
+        self.allow_decimal = allow_decimal
+        if answer is None:
+            answer = format_answer(safe_calculate(n1, op, n2), allow_decimal)
+        self.answer = answer
+
+    def text(self):
+        def fmt(v):
+            if isinstance(v, float) and v.is_integer():
+                return str(int(v))
+            return f"{v:.2f}" if isinstance(v, float) else str(v)
+        return f"{fmt(self.n1)} {self.op} {fmt(self.n2)} = ?"
+
+    def check(self, user_input):
+        if user_input.strip() == "":
+            return False, None, self.answer
+        try:
+            if self.allow_decimal:
+                u = round(float(user_input), 2)
+                return abs(u - self.answer) < 0.01, u, self.answer
+            else:
+                u = int(round(float(user_input)))
+                return u == self.answer, u, self.answer
+        except:
+            return False, None, self.answer
+
+
+class QuestionBank:
+    """
+    A batch of pre-generated questions stored column by column.
+    Operands and answers live in typed arrays, operators in one string.
+    """
+    def __init__(self, n1, ops, n2, answers, allow_decimal):
+        self.n1 = n1
+        self.ops = ops
+        self.n2 = n2
+        self.answers = answers
+        self.allow_decimal = allow_decimal
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, i):
+        return Question(self.n1[i], self.ops[i], self.n2[i],
+                        self.allow_decimal, answer=self.answers[i])
+
+    def __iter__(self):
+        for i in range(len(self.ops)):
+            yield self[i]
+
+
+OPERATORS = "+-*/"
+NO_ANSWER = float("nan")
+
+
+def read_answer_sheet(path):
+    """
+    Yield (n1, op, n2, answer) rows from a CSV answer sheet, skipping a
+    header on the first line. Every other row is yielded, short or not, so
+    grade_stream counts it and its position matches the sheet.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for i, row in enumerate(csv.reader(f)):
+            if i == 0 and row:
+                try:
+                    float(row[0])
+                except ValueError:
+                    continue
+            if len(row) > 1:
+                row[1] = row[1].strip()
+            yield tuple(row[:4])
+
+
+class GradeResult:
+    """
+    Outcome of grading a column of answers: correct holds 1/0 per answer,
+    parsed the rounded input (NaN where it was blank or not a number).
+    invalid lists the positions of rows whose question could not be worked
+    out (bad operator or operand, division by zero); those are marked wrong.
+    """
+    def __init__(self, correct, parsed, invalid=None):
+        self.correct = correct
+        self.parsed = parsed
+        self.invalid = invalid if invalid is not None else array("I")
+        self.total = len(correct)
+        self.n_correct = sum(correct)
+
+    def __len__(self):
+        return self.total
+
+
+class SessionHistory:
+    """
+    Answered questions kept as parallel typed arrays, 34 bytes per row:
+    operands, answer and the parsed input as doubles (NaN when there was
+    none), the operator code and a flags byte. Question text is only
+    formatted when a row is read back, e.g. by _end_quiz().
+    """
+    CORRECT = 1
+    DECIMAL = 2
+
+    def __init__(self):
+        self.n1 = array("d")
+        self.n2 = array("d")
+        self.answers = array("d")
+        self.parsed = array("d")
+        self.ops = array("b")
+        self.flags = array("b")
+
+    def __len__(self):
+        return len(self.flags)
+
+    def append(self, q, parsed, correct):
+        self.n1.append(q.n1)
+        self.n2.append(q.n2)
+        self.answers.append(q.answer)
+        self.parsed.append(NO_ANSWER if parsed is None else parsed)
+        self.ops.append(OPERATORS.index(q.op))
+        self.flags.append((self.CORRECT if correct else 0) |
+                          (self.DECIMAL if q.allow_decimal else 0))
+
+    def clear(self):
+        for column in (self.n1, self.n2, self.answers, self.parsed, self.ops, self.flags):
+            del column[:]
+
+    def question(self, i):
+        allow = bool(self.flags[i] & self.DECIMAL)
+        num = float if allow else int
+        return Question(num(self.n1[i]), OPERATORS[self.ops[i]], num(self.n2[i]),
+                        allow, answer=num(self.answers[i]))
+
+    def user_answer(self, i):
+        p = self.parsed[i]
+        if p != p:
+            return None
+        return p if self.flags[i] & self.DECIMAL else int(p)
+
+    def is_correct(self, i):
+        return bool(self.flags[i] & self.CORRECT)
+
+    def __getitem__(self, i):
+        """(question text, parsed input, expected answer, correct) for row i."""
+        q = self.question(i)
+        return q.text(), self.user_answer(i), q.answer, self.is_correct(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def incorrect(self):
+        """(Question, parsed input, expected answer) for every wrong row."""
+        rows = []
+        for i in range(len(self)):
+            if not self.flags[i] & self.CORRECT:
+                q = self.question(i)
+                rows.append((q, self.user_answer(i), q.answer))
+        return rows
+
+
+class QuizEngine:
+    def __init__(self, difficulty_name="Easy", max_questions=10, seed=None, adaptive=None):
+        self.settings = DIFFICULTY_SETTINGS[difficulty_name]
+        self.max_questions = max_questions
+        self.difficulty_name = difficulty_name
+        self.score = 0
+        self.asked = 0
+        self.history = SessionHistory()
+        self.current_question = None
+        # Always seeded, so any session can be replayed from its journal
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.bank = None
+        self.bank_pos = 0
+        self.journal = None
+        self.asked_at = None
+        # An adaptive.AdaptiveProfile, which then picks ranges and operator weights
+        self.adaptive = adaptive
+
+    def new_question(self):
+        self.asked_at = time.monotonic()
+        if self.bank is not None and self.bank_pos < len(self.bank):
+            q = self.bank[self.bank_pos]
+            self.bank_pos += 1
+            self.current_question = q
+            return q
+
+        settings = self.adaptive.settings() if self.adaptive else self.settings
+        ops = settings["operators"]
+        minv, maxv = settings["min"], settings["max"]
+        allow = settings["allow_decimal"]
+
+        if "weights" in settings:
+            op = self.rng.choices(ops, settings["weights"])[0]
+        else:
+            op = self.rng.choice(ops)
+
+        if op == "/":
+            if not allow:
+                b = self.rng.randint(max(1, minv), maxv)
+                a = b * self.rng.randint(1, 10)
+            else:
+                b = self.rng.uniform(minv, maxv)
+                a = self.rng.uniform(minv, maxv)
+        else:
+            a = round(self.rng.uniform(minv, maxv), 2) if allow else self.rng.randint(minv, maxv)
+            b = round(self.rng.uniform(minv, maxv), 2) if allow else self.rng.randint(minv, maxv)
+
+        q = Question(a, op, b, allow)
+        self.current_question = q
+        return q
+
+    def generate_bank(self, n, difficulty=None):
+        """
+        Draw n questions in one pass per column instead of one
+        new_question() call each. Uses the same ranges, the exact-division
+        rule and the same answer rounding as new_question().
+        """
+        settings = DIFFICULTY_SETTINGS[difficulty] if difficulty else self.settings
+        minv, maxv = settings["min"], settings["max"]
+        allow = settings["allow_decimal"]
+        rng = self.rng
+
+        ops = rng.choices(settings["operators"], k=n)
+        if allow:
+            span = maxv - minv
+            rand = rng.random
+            a = [minv + span * rand() for _ in range(n)]
+            b = [minv + span * rand() for _ in range(n)]
+            # "/" keeps the raw uniform operands, everything else is rounded
+            a = [x if op == "/" else round(x, 2) for x, op in zip(a, ops)]
+            b = [x if op == "/" else round(x, 2) for x, op in zip(b, ops)]
+        else:
+            values = range(minv, maxv + 1)
+            a = rng.choices(values, k=n)
+            b = rng.choices(values, k=n)
+            div = [i for i, op in enumerate(ops) if op == "/"]
+            if div:
+                divisors = rng.choices(range(max(1, minv), maxv + 1), k=len(div))
+                factors = rng.choices(range(1, 11), k=len(div))
+                for i, d, f in zip(div, divisors, factors):
+                    b[i] = d
+                    a[i] = d * f
+
+        answers = bulk_answers(a, ops, b, allow)
+
+        code = "d" if allow else "q"
+        return QuestionBank(array(code, a), "".join(ops), array(code, b),
+                            array(code, answers), allow)
+
+    def load_bank(self, bank):
+        """Serve the next questions from a bank made by generate_bank()."""
+        self.bank = bank
+        self.bank_pos = 0
+
+    def grade_batch(self, questions, answers):
+        """
+        Mark a whole answer sheet at once with the same rules as
+        Question.check: within 0.01 for decimal questions, exact otherwise.
+        questions is a QuestionBank or a sequence of Question objects.
+        """
+        if isinstance(questions, QuestionBank):
+            expected = questions.answers
+            allow = [questions.allow_decimal] * len(questions)
+        else:
+            expected = [q.answer for q in questions]
+            allow = [q.allow_decimal for q in questions]
+        if len(answers) != len(expected):
+            raise ValueError("Need one answer per question")
+
+        correct = array("b")
+        parsed = array("d")
+        inf = float("inf")
+        for value, exp, dec in zip(parse_answer_column(answers), expected, allow):
+            if value is None:
+                correct.append(0)
+                parsed.append(NO_ANSWER)
+            elif dec:
+                u = round(value, 2)
+                correct.append(abs(u - exp) < 0.01)
+                parsed.append(u)
+            elif value != value or value == inf or value == -inf:
+                # int(round()) raises on these, so check() treats them as no answer
+                correct.append(0)
+                parsed.append(NO_ANSWER)
+            else:
+                u = int(round(value))
+                correct.append(u == exp)
+                parsed.append(u)
+        return GradeResult(correct, parsed)
+
+    def grade_stream(self, rows, chunk_size=65536):
+        """
+        Grade an iterable of (n1, op, n2, answer) rows, e.g. from
+        read_answer_sheet(), yielding one GradeResult per chunk so files of
+        millions of answers never sit in memory at once. A row whose
+        question cannot be worked out is counted wrong and listed in the
+        chunk's invalid positions instead of stopping the stream.
+        """
+        allow = self.settings["allow_decimal"]
+        num = float if allow else int
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            n1, ops, n2, expected, texts = [], [], [], [], []
+            invalid = array("I")
+            for i, r in enumerate(chunk):
+                try:
+                    op = r[1]
+                    if len(op) != 1 or op not in OPERATORS:
+                        raise ValueError("Invalid operator")
+                    a, b = num(r[0]), num(r[2])
+                    answer = format_answer(safe_calculate(a, op, b), allow)
+                    if not math.isfinite(answer):
+                        raise ValueError("Answer is not a number")
+                    text = r[3]
+                except (IndexError, ValueError, ZeroDivisionError, OverflowError):
+                    # A stand-in question with no answer, so the row is marked wrong
+                    invalid.append(i)
+                    a, op, b, answer, text = 0, "+", 0, 0, ""
+                n1.append(a)
+                ops.append(op)
+                n2.append(b)
+                expected.append(answer)
+                texts.append(text)
+            result = self.grade_batch(QuestionBank(n1, "".join(ops), n2, expected, allow), texts)
+            result.invalid = invalid
+            yield result
+
+    def submit_answer(self, txt, elapsed=None):
+        """Mark the current question; elapsed overrides the measured time (journal replay)."""
+        correct, parsed, expected = self.current_question.check(txt)
+        self.asked += 1
+        if elapsed is None:
+            elapsed = time.monotonic() - self.asked_at
+        if self.journal is not None:
+            self.journal.record(txt, elapsed)
+        if self.adaptive is not None:
+            self.adaptive.record(self.current_question.op, correct, elapsed)
+
+        if correct:
+            self.score += 1
+
+        self.history.append(self.current_question, parsed, correct)
+        return correct, parsed, expected
+
+    @property
+    def incorrect(self):
+        return self.history.incorrect()
+
+    def is_finished(self):
+        return self.asked >= self.max_questions
+
+    def reset(self):
+        self.score = 0
+        self.asked = 0
+        self.history.clear()
+        self.current_question = None
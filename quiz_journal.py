@@ -0,0 +1,227 @@
+"""
+Replayable quiz session journals.
+
+A journal is a small binary record of one session: the engine seed,
+difficulty and length, the adaptive profile the session started from (if
+any), then every typed answer with how long it took, and finally the
+score. Because QuizEngine draws every question from its seeded rng, and an
+adaptive profile only moves with the answers and their times, re-running
+the answers against a fresh engine reproduces the session exactly. The
+replay driver does that for thousands of journals in a process pool,
+without Tk, to check scoring and find slow sessions.
+
+    python quiz_journal.py generate --count 5000 --out journals
+    python quiz_journal.py replay journals --processes 8
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from adaptive import AdaptiveProfile
+from quiz_core import DIFFICULTY_SETTINGS, MAX_QUESTIONS, QuizEngine
+
+MAGIC = b"QZJ2"
+MAGIC_V1 = b"QZJ1"                 # no profile, float32 times
+HEADER = struct.Struct("<4sQBI")   # magic, seed, difficulty length, max questions
+PROFILE_LEN = struct.Struct("<I")  # then that many bytes of profile JSON, 0 for none
+# Exact times, since an adaptive replay compares them against thresholds
+ELAPSED = struct.Struct("<d")
+ELAPSED_V1 = struct.Struct("<f")
+SCORE = struct.Struct("<I")
+END = 0xFF                         # answer-length byte that marks the trailer
+MAX_ANSWER = END - 1
+JOURNAL_SUFFIX = ".qzj"
+
+
+class SessionJournal:
+    def __init__(self, seed, difficulty, max_questions, profile=None):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.max_questions = max_questions
+        # AdaptiveProfile.to_dict() as the session started, or None
+        self.profile = profile
+        self.answers = []
+        self.elapsed = array("d")
+        self.score = None
+
+    @classmethod
+    def attach(cls, engine):
+        """Start journaling an engine's session; the engine records each answer."""
+        profile = engine.adaptive.to_dict() if engine.adaptive is not None else None
+        engine.journal = cls(engine.seed, engine.difficulty_name, engine.max_questions, profile)
+        return engine.journal
+
+    def record(self, answer, elapsed):
+        self.answers.append(answer)
+        self.elapsed.append(elapsed)
+
+    def finish(self, score):
+        self.score = score
+
+    # ---------- binary format ----------
+    def to_bytes(self):
+        name = self.difficulty.encode("utf-8")
+        profile = json.dumps(self.profile).encode("utf-8") if self.profile is not None else b""
+        parts = [HEADER.pack(MAGIC, self.seed, len(name), self.max_questions), name,
+                 PROFILE_LEN.pack(len(profile)), profile]
+        for answer, elapsed in zip(self.answers, self.elapsed):
+            raw = answer.encode("utf-8")[:MAX_ANSWER]
+            parts.append(bytes((len(raw),)))
+            parts.append(raw)
+            parts.append(ELAPSED.pack(elapsed))
+        if self.score is not None:
+            parts.append(bytes((END,)))
+            parts.append(SCORE.pack(self.score))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, seed, name_len, max_questions = HEADER.unpack_from(data)
+        if magic not in (MAGIC, MAGIC_V1):
+            raise ValueError("Not a quiz journal")
+        pos = HEADER.size
+        journal = cls(seed, data[pos:pos + name_len].decode("utf-8"), max_questions)
+        pos += name_len
+        elapsed = ELAPSED
+        if magic == MAGIC_V1:
+            elapsed = ELAPSED_V1
+        else:
+            (profile_len,) = PROFILE_LEN.unpack_from(data, pos)
+            pos += PROFILE_LEN.size
+            if profile_len:
+                journal.profile = json.loads(data[pos:pos + profile_len])
+            pos += profile_len
+
+        while pos < len(data):
+            n = data[pos]
+            pos += 1
+            if n == END:
+                journal.score = SCORE.unpack_from(data, pos)[0]
+                break
+            answer = data[pos:pos + n].decode("utf-8", "replace")
+            pos += n
+            journal.record(answer, elapsed.unpack_from(data, pos)[0])
+            pos += elapsed.size
+        return journal
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def save_session(engine, directory):
+    """Write a finished engine's journal into directory, named after its seed."""
+    journal = engine.journal
+    journal.finish(engine.score)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{journal.seed:016x}{JOURNAL_SUFFIX}")
+    journal.save(path)
+    return path
+
+
+# ---------- replay ----------
+def replay(path):
+    """Re-run one journal against a fresh engine at full speed."""
+    journal = SessionJournal.load(path)
+    profile = AdaptiveProfile.from_dict(journal.profile) if journal.profile else None
+    engine = QuizEngine(journal.difficulty, journal.max_questions, seed=journal.seed,
+                        adaptive=profile)
+
+    slowest = 0.0
+    start = time.perf_counter()
+    for answer, elapsed in zip(journal.answers, journal.elapsed):
+        t = time.perf_counter()
+        engine.new_question()
+        engine.submit_answer(answer, elapsed)
+        slowest = max(slowest, time.perf_counter() - t)
+    seconds = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "score": engine.score,
+        "recorded_score": journal.score,
+        "ok": journal.score is None or journal.score == engine.score,
+        "answers": len(journal.answers),
+        "seconds": seconds,
+        "slowest_answer_seconds": slowest,
+        "player_seconds": round(sum(journal.elapsed), 3),
+    }
+
+
+def find_journals(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(JOURNAL_SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def replay_many(paths, processes=None, top=10):
+    paths = list(find_journals(paths))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes) as pool:
+        results = list(pool.map(replay, paths, chunksize=max(1, len(paths) // 64)))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [r for r in results if not r["ok"]]
+    results.sort(key=lambda r: r["seconds"], reverse=True)
+    return {
+        "journals": len(results),
+        "answers": sum(r["answers"] for r in results),
+        "seconds": round(elapsed, 3),
+        "journals_per_sec": round(len(results) / elapsed, 1) if elapsed else None,
+        "mismatches": [r["path"] for r in mismatches],
+        "slowest": [{"path": r["path"], "ms": round(r["seconds"] * 1000, 3)}
+                    for r in results[:top]],
+    }
+
+
+def generate(directory, count, seed=0):
+    """Write synthetic journals from bot players, for load testing the replay."""
+    rng = random.Random(seed)
+    difficulties = list(DIFFICULTY_SETTINGS)
+    for _ in range(count):
+        engine = QuizEngine(rng.choice(difficulties), MAX_QUESTIONS, seed=rng.getrandbits(64))
+        SessionJournal.attach(engine)
+        while not engine.is_finished():
+            q = engine.new_question()
+            engine.submit_answer(str(q.answer) if rng.random() < 0.7 else str(rng.randint(-9, 99)))
+        save_session(engine, directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quiz session journals")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    gen = sub.add_parser("generate", help="write synthetic journals")
+    gen.add_argument("--count", type=int, default=1000)
+    gen.add_argument("--out", default="journals")
+    gen.add_argument("--seed", type=int, default=0)
+    rep = sub.add_parser("replay", help="replay journals in a process pool")
+    rep.add_argument("paths", nargs="+")
+    rep.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.mode == "generate":
+        generate(args.out, args.count, args.seed)
+        return
+
+    report = replay_many(args.paths, args.processes)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Headless quiz server.
+
+Runs many independent QuizEngine sessions on one asyncio event loop and
+speaks line-delimited JSON over a local socket. Every request is one JSON
+object per line and every reply is one JSON object per line:
+
+    {"cmd": "start", "difficulty": "Easy", "questions": 10}
+    {"cmd": "answer", "session": 1, "number": 1, "answer": "7"}
+    {"cmd": "skip", "session": 1, "number": 1}
+    {"cmd": "end", "session": 1}
+
+Each question gets an absolute deadline from DIFFICULTY_SETTINGS[...]["timer"]
+with a single loop.call_at() callback, no per-second polling. When it fires
+the question is marked wrong and the server pushes a "timeout" event with
+the next question to the connection that owns the session.
+
+    python quiz_server.py serve
+    python quiz_server.py load --spawn --sessions 2000 --clients 200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+
+from latency import add_server_args, open_connection, percentile, spawned_server
+from quiz_core import DIFFICULTY_SETTINGS, MAX_QUESTIONS, QuizEngine, safe_calculate
+from quiz_journal import SessionJournal, save_session
+
+SOCKET_PATH = "quiz.sock"
+
+
+class Session:
+    def __init__(self, sid, engine, writer):
+        self.id = sid
+        self.engine = engine
+        self.writer = writer
+        self.number = 0
+        self.deadline = None
+        self.timer_handle = None
+
+
+class QuizServer:
+    def __init__(self, journal_dir=None):
+        self.journal_dir = journal_dir
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self.loop = None
+
+    # ---------- sessions ----------
+    def start_session(self, writer, difficulty="Easy", questions=MAX_QUESTIONS):
+        if difficulty not in DIFFICULTY_SETTINGS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        session = Session(next(self._ids), QuizEngine(difficulty, int(questions)), writer)
+        if self.journal_dir:
+            SessionJournal.attach(session.engine)
+        self.sessions[session.id] = session
+        return self._ask(session, {"session": session.id})
+
+    def _ask(self, session, reply):
+        self._cancel_deadline(session)
+        engine = session.engine
+
+        if engine.is_finished():
+            self._close_session(session)
+            reply.update(finished=True, score=engine.score, total=engine.max_questions)
+            return reply
+
+        q = engine.new_question()
+        session.number += 1
+        timeout = engine.settings["timer"]
+        session.deadline = self.loop.time() + timeout
+        session.timer_handle = self.loop.call_at(session.deadline, self._on_deadline, session)
+
+        reply.update(number=session.number, question=q.text(), timeout=timeout,
+                     score=engine.score)
+        return reply
+
+    def _cancel_deadline(self, session):
+        if session.timer_handle is not None:
+            session.timer_handle.cancel()
+            session.timer_handle = None
+
+    def _on_deadline(self, session):
+        session.timer_handle = None
+        if self.sessions.get(session.id) is not session:
+            return
+        _, _, expected = session.engine.submit_answer("")
+        reply = self._ask(session, {"session": session.id, "event": "timeout",
+                                    "expected": expected})
+        self._send(session.writer, reply)
+
+    def answer(self, sid, number, text):
+        session = self._get(sid)
+        if number is not None and int(number) != session.number:
+            return {"session": sid, "error": "stale question", "number": session.number}
+
+        if self.loop.time() >= session.deadline:
+            # The deadline callback is due but has not run yet
+            text = ""
+
+        correct, parsed, expected = session.engine.submit_answer(text)
+        return self._ask(session, {"session": sid, "correct": correct,
+                                   "expected": expected})
+
+    def end_session(self, sid):
+        session = self._get(sid)
+        self._close_session(session)
+        engine = session.engine
+        return {"session": sid, "finished": True, "score": engine.score,
+                "total": engine.max_questions}
+
+    def _close_session(self, session):
+        self._cancel_deadline(session)
+        if self.sessions.pop(session.id, None) is not None and session.engine.journal is not None:
+            try:
+                save_session(session.engine, self.journal_dir)
+            except OSError as e:
+                print(f"Could not save journal for session {session.id}: {e}", file=sys.stderr)
+
+    def _get(self, sid):
+        try:
+            return self.sessions[int(sid)]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Unknown session: {sid}")
+
+    def _drop_connection(self, writer):
+        for session in list(self.sessions.values()):
+            if session.writer is writer:
+                # Journaled like any other end: aborted sessions are the ones worth replaying
+                self._close_session(session)
+
+    # ---------- protocol ----------
+    def dispatch(self, writer, msg):
+        cmd = msg.get("cmd")
+        if cmd == "start":
+            return self.start_session(writer, msg.get("difficulty", "Easy"),
+                                      msg.get("questions", MAX_QUESTIONS))
+        if cmd == "answer":
+            return self.answer(msg.get("session"), msg.get("number"),
+                               str(msg.get("answer", "")))
+        if cmd == "skip":
+            return self.answer(msg.get("session"), msg.get("number"), "")
+        if cmd == "end":
+            return self.end_session(msg.get("session"))
+        raise ValueError(f"Unknown command: {cmd}")
+
+    def _send(self, writer, reply):
+        if not writer.is_closing():
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.dispatch(writer, json.loads(line))
+                except (ValueError, AttributeError, TypeError) as e:
+                    reply = {"error": str(e)}
+                self._send(writer, reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._drop_connection(writer)
+            writer.close()
+
+    async def serve(self, path=SOCKET_PATH, port=None):
+        self.loop = asyncio.get_running_loop()
+        if port is not None:
+            server = await asyncio.start_server(self.handle_client, "127.0.0.1", port)
+        else:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle_client, path)
+        async with server:
+            await server.serve_forever()
+
+
+# ---------- load generator ----------
+def solve(question_text):
+    """Work out the answer from a question's text, as a bot player would."""
+    a, op, b = question_text.split()[:3]
+    try:
+        return str(round(safe_calculate(float(a), op, float(b)), 2))
+    except ZeroDivisionError:
+        return "0"
+
+
+async def _client(path, port, n_sessions, difficulty, questions, latencies):
+    reader, writer = await open_connection(path, port)
+
+    async def request(msg):
+        writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+        await writer.drain()
+        while True:
+            reply = json.loads(await reader.readline())
+            if reply.get("event") != "timeout":
+                return reply
+
+    done = 0
+    try:
+        for _ in range(n_sessions):
+            reply = await request({"cmd": "start", "difficulty": difficulty,
+                                   "questions": questions})
+            while not reply.get("finished"):
+                if "error" in reply:
+                    raise RuntimeError(reply["error"])
+                sent = time.perf_counter()
+                reply = await request({"cmd": "answer", "session": reply["session"],
+                                       "number": reply["number"],
+                                       "answer": solve(reply["question"])})
+                latencies.append(time.perf_counter() - sent)
+            done += 1
+    finally:
+        writer.close()
+    return done
+
+
+async def run_load(path=SOCKET_PATH, port=None, sessions=1000, clients=100,
+                   difficulty="Easy", questions=MAX_QUESTIONS):
+    latencies = []
+    per_client = [sessions // clients + (1 if i < sessions % clients else 0)
+                  for i in range(clients)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_client(path, port, n, difficulty, questions, latencies)
+                                     for n in per_client if n))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "sessions": sum(results),
+        "answers": len(latencies),
+        "seconds": round(elapsed, 3),
+        "sessions_per_sec": round(sum(results) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def _probe(path, port):
+    _, writer = await open_connection(path, port)
+    writer.close()
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless quiz server")
+    serve, load = add_server_args(parser, SOCKET_PATH)
+    serve.add_argument("--journal-dir", default=None,
+                       help="save a replayable journal of every session")
+    load.add_argument("--sessions", type=int, default=1000)
+    load.add_argument("--clients", type=int, default=100)
+    load.add_argument("--difficulty", default="Easy", choices=list(DIFFICULTY_SETTINGS))
+    load.add_argument("--questions", type=int, default=MAX_QUESTIONS)
+    load.add_argument("--journal-dir", default=None,
+                      help="with --spawn, have the server journal every session")
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        try:
+            asyncio.run(QuizServer(args.journal_dir).serve(args.socket, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    def load_test():
+        return asyncio.run(run_load(args.socket, args.port, args.sessions, args.clients,
+                                    args.difficulty, args.questions))
+
+    if not args.spawn:
+        stats = load_test()
+    else:
+        cmd = ["--socket", args.socket]
+        if args.journal_dir:
+            cmd += ["--journal-dir", args.journal_dir]
+        if args.port is not None:
+            cmd += ["--port", str(args.port)]
+        with spawned_server(__file__, cmd, lambda: asyncio.run(_probe(args.socket, args.port))):
+            stats = load_test()
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Bot-player simulation for capacity planning.
+
+Runs N bot players in a process pool. Each bot plays whole QuizEngine
+sessions with a configurable accuracy and think-time model and saves every
+result with Leaderboard.add_score against one shared score log. We collect
+throughput, how long writers waited on the log lock, and latency histograms
+for answering and saving, and can sweep the process count to see how the
+design scales with cores:
+
+    python quiz_simulate.py --players 64 --sessions 20 --processes 1 2 4 8
+    python quiz_simulate.py --think exponential --think-mean 2 --time-scale 0.01
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from latency import Histogram
+from leaderboard import Leaderboard
+from quiz_core import DIFFICULTY_SETTINGS, MAX_QUESTIONS, QuizEngine
+
+THINK_MODELS = ("none", "constant", "exponential", "lognormal")
+
+
+def think_time(rng, model, mean):
+    if model == "none" or mean <= 0:
+        return 0.0
+    if model == "constant":
+        return mean
+    if model == "exponential":
+        return rng.expovariate(1 / mean)
+    # lognormal with the requested mean and a moderate spread
+    sigma = 0.5
+    return rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+
+def play(bot):
+    """One bot player: several sessions, each ending in add_score. Runs in a worker."""
+    rng = random.Random(bot["seed"])
+    lb = Leaderboard(bot["scores"], legacy_file=None)
+    answer_hist = Histogram()
+    save_hist = Histogram()
+    answers = 0
+
+    for _ in range(bot["sessions"]):
+        engine = QuizEngine(bot["difficulty"], bot["questions"], seed=rng.getrandbits(64))
+        while not engine.is_finished():
+            q = engine.new_question()
+            pause = think_time(rng, bot["think"], bot["think_mean"]) * bot["time_scale"]
+            if pause:
+                time.sleep(pause)
+            reply = str(q.answer) if rng.random() < bot["accuracy"] else "wrong"
+            start = time.perf_counter()
+            engine.submit_answer(reply)
+            answer_hist.add(time.perf_counter() - start)
+            answers += 1
+
+        start = time.perf_counter()
+        lb.add_score(bot["name"], engine.score, bot["difficulty"])
+        save_hist.add(time.perf_counter() - start)
+
+    lb.close()
+    return {
+        "sessions": bot["sessions"],
+        "answers": answers,
+        "lock_wait_seconds": lb.lock_wait_seconds,
+        "lock_waits": lb.lock_waits,
+        "answer_hist": answer_hist.counts,
+        "save_hist": save_hist.counts,
+    }
+
+
+def simulate(players=32, sessions=10, processes=None, difficulty="Easy",
+             questions=MAX_QUESTIONS, accuracy=0.7, think="none", think_mean=0.0,
+             time_scale=1.0, scores=None, seed=0):
+    tmpdir = None
+    if scores is None:
+        tmpdir = tempfile.mkdtemp(prefix="quiz-sim-")
+        scores = os.path.join(tmpdir, "scores.log")
+
+    rng = random.Random(seed)
+    bots = [{
+        "name": f"bot{i}", "seed": rng.getrandbits(64), "scores": scores,
+        "sessions": sessions, "difficulty": difficulty, "questions": questions,
+        "accuracy": accuracy, "think": think, "think_mean": think_mean,
+        "time_scale": time_scale,
+    } for i in range(players)]
+
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(play, bots))
+        elapsed = time.perf_counter() - start
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    answer_hist, save_hist = Histogram(), Histogram()
+    for r in results:
+        answer_hist.merge(Histogram(r["answer_hist"]))
+        save_hist.merge(Histogram(r["save_hist"]))
+    total_sessions = sum(r["sessions"] for r in results)
+    lock_wait = sum(r["lock_wait_seconds"] for r in results)
+    lock_waits = sum(r["lock_waits"] for r in results)
+
+    return {
+        "processes": processes or os.cpu_count(),
+        "players": players,
+        "seconds": round(elapsed, 3),
+        "sessions_per_sec": round(total_sessions / elapsed, 1),
+        "answers_per_sec": round(sum(r["answers"] for r in results) / elapsed, 1),
+        "scores_lock": {
+            "acquisitions": lock_waits,
+            "total_wait_seconds": round(lock_wait, 4),
+            "mean_wait_ms": round(lock_wait / lock_waits * 1000, 4) if lock_waits else 0.0,
+        },
+        "answer_latency": answer_hist.summary(),
+        "save_latency": save_hist.summary(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot-player quiz simulation")
+    parser.add_argument("--players", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=10, help="sessions per player")
+    parser.add_argument("--processes", type=int, nargs="*", default=[None],
+                        help="one or more pool sizes to sweep")
+    parser.add_argument("--difficulty", default="Easy", choices=list(DIFFICULTY_SETTINGS))
+    parser.add_argument("--questions", type=int, default=MAX_QUESTIONS)
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--think", default="none", choices=THINK_MODELS)
+    parser.add_argument("--think-mean", type=float, default=0.0, help="mean think time in seconds")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiply think times, e.g. 0.01 to run 100x faster than real time")
+    parser.add_argument("--scores", default=None, help="score log to use (default: a temp file)")
+    args = parser.parse_args(argv)
+
+    reports = [simulate(args.players, args.sessions, p, args.difficulty, args.questions,
+                        args.accuracy, args.think, args.think_mean, args.time_scale, args.scores)
+               for p in args.processes]
+    print(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Non-repeating random order over a corpus.
+
+A ShuffleBag hands out every index in range(size) once, in random order,
+before starting a new round. It keeps one array('I') permutation and runs
+Fisher–Yates one step per draw: pick a random slot in the undrawn tail,
+swap it to the cursor, advance. A draw is O(1) and nothing is shuffled up
+front, so a bag over millions of jokes opens instantly.
+
+Jokes appended to the corpus are simply added to the undrawn tail, where
+the next draws mix them in; nothing already in the bag is reshuffled. The
+permutation and cursor are saved to a small binary file between runs.
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b"BAG1"
+HEADER = struct.Struct("<4sQQq")   # magic, size, cursor, last drawn (-1 for none)
+BAG_SUFFIX = ".bag"
+
+
+class ShuffleBag:
+    def __init__(self, size=0, seed=None):
+        self.rng = random.Random(seed)
+        self.perm = array("I", range(size))
+        self.cursor = 0
+        self.last = -1
+
+    def __len__(self):
+        return len(self.perm)
+
+    def remaining(self):
+        """Draws left before the current round ends."""
+        return len(self.perm) - self.cursor
+
+    def draw(self):
+        perm = self.perm
+        n = len(perm)
+        if not n:
+            raise IndexError("draw from an empty bag")
+        if self.cursor >= n:
+            self.cursor = 0
+
+        i = self.cursor
+        if i == 0 and n > 1 and perm[-1] == self.last:
+            # A new round must not open with the joke that closed the last one
+            j = self.rng.randrange(0, n - 1)
+        else:
+            j = self.rng.randrange(i, n)
+        perm[i], perm[j] = perm[j], perm[i]
+        self.cursor = i + 1
+        self.last = perm[i]
+        return self.last
+
+    def resize(self, size):
+        """Follow the corpus: new indices join this round, vanished ones are dropped."""
+        n = len(self.perm)
+        if size >= n:
+            self.perm.extend(range(n, size))
+            return
+        drawn = sum(1 for x in self.perm[:self.cursor] if x < size)
+        self.perm = array("I", (x for x in self.perm if x < size))
+        self.cursor = drawn
+        if self.last >= size:
+            self.last = -1
+
+    # ---------- persistence ----------
+    def to_bytes(self):
+        perm = self.perm
+        if sys.byteorder == "big":
+            perm = array("I", perm)
+            perm.byteswap()
+        return HEADER.pack(MAGIC, len(perm), self.cursor, self.last) + perm.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        magic, size, cursor, last = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a shuffle bag")
+        bag = cls(0, seed)
+        bag.perm.frombytes(data[HEADER.size:])
+        if sys.byteorder == "big":
+            bag.perm.byteswap()
+        if len(bag.perm) != size or cursor > size:
+            raise ValueError("Truncated shuffle bag")
+        bag.cursor = cursor
+        bag.last = last
+        return bag
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=".bag-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.to_bytes())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, size=None, seed=None):
+        """The saved bag resized to size (None leaves it as saved), or a fresh one if there is none."""
+        try:
+            with open(path, "rb") as f:
+                bag = cls.from_bytes(f.read(), seed)
+        except (OSError, ValueError, struct.error):
+            return cls(size or 0, seed)
+        if size is not None:
+            bag.resize(size)
+        return bag
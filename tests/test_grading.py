@@ -0,0 +1,77 @@
+import math
+import random
+
+import pytest
+
+from quiz_core import DIFFICULTY_SETTINGS, QuizEngine, read_answer_sheet
+
+ODD_ANSWERS = ["", " ", "abc", "nan", "inf", "-inf", "1e400", "1_000", "٣", " 7 ", "+3",
+               "-0", ".5", "5.", "2.004", "2.005", "-1.995", "1e2", "0x10", "3/4", "--1"]
+
+
+def answer_texts(rng, questions):
+    """Right, nearly right, wrong and malformed answers for each question."""
+    for q in questions:
+        exp = q.answer
+        choice = rng.random()
+        if choice < 0.3:
+            yield str(exp)
+        elif choice < 0.5:
+            yield f"{exp + rng.choice([-0.01, -0.006, -0.004, 0.004, 0.006, 0.01, 0.5]):.4f}"
+        elif choice < 0.7:
+            yield str(rng.randrange(-200, 200))
+        else:
+            yield rng.choice(ODD_ANSWERS)
+
+
+@pytest.mark.parametrize("difficulty", list(DIFFICULTY_SETTINGS))
+def test_grade_batch_matches_question_check(difficulty):
+    rng = random.Random(difficulty)
+    engine = QuizEngine(difficulty, seed=1)
+    questions = [engine.new_question() for _ in range(3000)]
+    bank = engine.generate_bank(3000)
+    for qs in (questions, bank):
+        texts = list(answer_texts(rng, qs))
+        result = engine.grade_batch(qs, texts)
+        for i, (q, text) in enumerate(zip(qs, texts)):
+            correct, parsed, _ = q.check(text)
+            assert bool(result.correct[i]) == correct, (str(q.text()), text)
+            if parsed is None or parsed != parsed:
+                assert math.isnan(result.parsed[i])
+            else:
+                assert result.parsed[i] == parsed
+        assert result.n_correct == sum(q.check(t)[0] for q, t in zip(qs, texts))
+
+
+def test_grade_batch_needs_one_answer_per_question():
+    engine = QuizEngine("Easy", seed=1)
+    with pytest.raises(ValueError):
+        engine.grade_batch(engine.generate_bank(3), ["1", "2"])
+
+
+def test_grade_stream_marks_bad_rows_invalid():
+    engine = QuizEngine("Medium", seed=1)
+    rows = [("3", "+", "4", "7"), ("3", "", "4", "7"), ("3", "+-", "4", "7"),
+            ("3.0", "*", "2", "6"), ("", "+", "1", "1"), ("8", "/", "0", "0"),
+            ("8", "/", "2", "4"), ("1", "-"), ("9", "-", "4", "3")]
+    results = list(engine.grade_stream(rows, chunk_size=4))
+    assert [list(r.correct) for r in results] == [[1, 0, 0, 0], [0, 0, 1, 0], [0]]
+    assert [list(r.invalid) for r in results] == [[1, 2, 3], [0, 1, 3], []]
+    assert sum(r.n_correct for r in results) == 2
+
+
+def test_read_answer_sheet_keeps_every_row_after_a_header(tmp_path):
+    path = tmp_path / "sheet.csv"
+    path.write_text("n1,op,n2,answer\n1,+,2,3\n1,,2,3\n1,+-,2,3\n4, * ,5,20\n6,/,3\n7\n")
+    rows = list(read_answer_sheet(str(path)))
+    assert rows == [("1", "+", "2", "3"), ("1", "", "2", "3"), ("1", "+-", "2", "3"),
+                    ("4", "*", "5", "20"), ("6", "/", "3"), ("7",)]
+    (result,) = QuizEngine("Easy").grade_stream(rows)
+    assert list(result.correct) == [1, 0, 0, 1, 0, 0]
+    assert list(result.invalid) == [1, 2, 4, 5]
+
+
+def test_read_answer_sheet_without_header(tmp_path):
+    path = tmp_path / "sheet.csv"
+    path.write_text("1,x,2,3\n2,*,2,4\n")
+    assert list(read_answer_sheet(str(path))) == [("1", "x", "2", "3"), ("2", "*", "2", "4")]
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from joke_corpus import MISSING_PUNCHLINE, JokeCorpus, scan_offsets, split_joke
+
+LINES = ["Why did the chicken cross the road?To get to the other side.",
+         "   ", "No punchline here", "",
+         "  What is brown and sticky?A stick.  ", "\t", "Ünïcode joke?Yes 🎉"]
+
+
+def expected_jokes(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+@pytest.fixture
+def joke_file(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_split_joke():
+    assert split_joke("Why?Because.") == ("Why?", "Because.")
+    assert split_joke("A?B?C") == ("A?", "B?C")
+    assert split_joke("No question") == ("No question?", MISSING_PUNCHLINE)
+
+
+@pytest.mark.parametrize("text", ["", "\n\n", "one", "one\n", " \r\n two\r\n\n three",
+                                  "a\n \t\nb\n\x0c\nc"])
+def test_scan_offsets_finds_nonblank_lines(text):
+    data = text.encode("utf-8")
+    starts = scan_offsets(data)
+    lines = [data[s:].split(b"\n", 1)[0].decode().strip() for s in starts]
+    assert lines == expected_jokes(text)
+
+
+def test_corpus_reads_every_nonblank_line(joke_file):
+    with JokeCorpus(joke_file) as corpus:
+        assert [corpus[i] for i in range(len(corpus))] == expected_jokes("\n".join(LINES))
+        assert corpus.joke(1) == ("No punchline here?", MISSING_PUNCHLINE)
+        assert corpus.joke(3) == ("Ünïcode joke?", "Yes 🎉")
+
+
+def test_index_is_saved_and_reused(joke_file):
+    with JokeCorpus(joke_file) as corpus:
+        offsets = list(corpus.all_offsets)
+    assert os.path.exists(joke_file + ".idx")
+
+    with JokeCorpus(joke_file) as corpus:
+        assert corpus._load_index() is not None
+        assert list(corpus.all_offsets) == offsets
+
+
+def test_stale_or_damaged_index_is_rebuilt(joke_file):
+    JokeCorpus(joke_file).close()
+    with open(joke_file, "a", encoding="utf-8") as f:
+        f.write("Appended?Yes.\n")
+    with JokeCorpus(joke_file) as corpus:
+        assert corpus[len(corpus) - 1] == "Appended?Yes."
+
+    with open(joke_file + ".idx", "r+b") as f:
+        f.truncate(f.seek(0, os.SEEK_END) - 3)
+    with JokeCorpus(joke_file) as corpus:
+        assert corpus[len(corpus) - 1] == "Appended?Yes."
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    with JokeCorpus(str(path)) as corpus:
+        assert len(corpus) == 0
+
+
+def test_extends_only_after_a_plain_append(joke_file):
+    old = JokeCorpus(joke_file)
+    with open(joke_file, "a", encoding="utf-8") as f:
+        f.write("More?Jokes.\n")
+    appended = old.reload()
+    assert appended.extends(old)
+    assert [appended[i] for i in range(len(old))] == [old[i] for i in range(len(old))]
+    old.close()
+
+    with open(joke_file, "w", encoding="utf-8") as f:
+        f.write("Rewritten?Yes.\n")
+    rewritten = appended.reload()
+    assert not rewritten.extends(appended)
+    appended.close()
+    rewritten.close()
+
+
+def test_larger_rewrite_in_place_is_not_an_append(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_bytes(b"A?a\nB?b\n")
+    old = JokeCorpus(str(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("AB?ab\nC?c\nD?d\n")
+    fresh = old.reload()
+    assert [fresh[i] for i in range(len(fresh))] == ["AB?ab", "C?c", "D?d"]
+    assert not fresh.extends(old)
+    old.close()
+    fresh.close()
+
+
+def test_dedup_never_extends(joke_file):
+    old = JokeCorpus(joke_file, dedup=0.8)
+    with open(joke_file, "a", encoding="utf-8") as f:
+        f.write("More?Jokes.\n")
+    fresh = old.reload()
+    assert fresh.dedup == 0.8
+    assert not fresh.extends(old)
+    old.close()
+    fresh.close()
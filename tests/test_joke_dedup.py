@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from joke_corpus import JokeCorpus
+from joke_dedup import _Groups, find_duplicates, lsh_params, minhash, shingles, similarity
+
+BASE = ["Why did the chicken cross the road?To get to the other side of it.",
+        "What do you call a fish with no eyes?A fsh, obviously, my friend.",
+        "Why don't skeletons fight each other?They don't have the guts for it.",
+        "What is brown and sticky?A stick, found lying on the forest floor.",
+        "How do you organize a space party?You planet well in advance, always."]
+
+
+def near_copy(rng, line):
+    chars = list(line)
+    for _ in range(rng.randrange(0, 3)):
+        chars[rng.randrange(len(chars))] = rng.choice("abcdefgh ")
+    return "".join(chars)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    rng = random.Random(5)
+    lines = []
+    for _ in range(300):
+        if rng.random() < 0.5:
+            lines.append(near_copy(rng, rng.choice(BASE)))
+        else:
+            words = [rng.choice(["cat", "dog", "pun", "joke", "bar", "walks", "into", "a"])
+                     for _ in range(rng.randrange(3, 9))]
+            lines.append(" ".join(words) + "?" + rng.choice(["Ha.", "Ouch.", "Nope."]))
+    path = tmp_path / "jokes.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    with JokeCorpus(str(path)) as c:
+        yield c
+
+
+def pairwise(lines):
+    """{(j, i): similarity} for every j < i."""
+    sets = [shingles(line) for line in lines]
+    return {(j, i): len(sets[j] & sets[i]) / len(sets[j] | sets[i])
+            for i in range(len(sets)) for j in range(i)}
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8])
+def test_groups_agree_with_pairwise_similarity(corpus, threshold):
+    lines = [corpus.line_at(o) for o in corpus.all_offsets]
+    sims = pairwise(lines)
+    exact = _Groups(len(lines))
+    for (j, i), sim in sims.items():
+        if sim >= threshold:
+            exact.union(j, i)
+    merged = find_duplicates(corpus, threshold)
+
+    found = _Groups(len(lines))
+    for root, dups in merged:
+        assert all(root < d for d in dups)
+        for d in dups:
+            # Only ever merges what exact pairwise similarity also connects
+            assert exact.find(d) == exact.find(root)
+            found.union(root, d)
+
+    # Copies that close are all but certain to share a band
+    for (j, i), sim in sims.items():
+        if sim >= 0.9:
+            assert found.find(i) == found.find(j), (lines[j], lines[i])
+
+
+def test_exact_duplicates_keep_the_first(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_text("x?y\n" + "Same joke?Same answer.\n" * 50 + "other?one\n", encoding="utf-8")
+    with JokeCorpus(str(path)) as corpus:
+        assert find_duplicates(corpus, 0.8) == [[1, list(range(2, 51))]]
+
+
+def test_minhash_estimates_similarity():
+    a = BASE[0]
+    b = near_copy(random.Random(1), a)
+    sa, sb = minhash(a, 256), minhash(b, 256)
+    estimate = sum(x == y for x, y in zip(sa, sb)) / 256
+    assert abs(estimate - similarity(a, b)) < 0.15
+
+
+def test_lsh_params_split_the_signature():
+    for threshold in (0.3, 0.5, 0.8, 0.95):
+        bands, rows = lsh_params(threshold)
+        assert bands * rows == 64
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from joke_corpus import JokeCorpus
+from joke_search import JokeIndex, tokenize
+
+WORDS = ["pizza", "pizzeria", "pie", "chicken", "road", "cross", "dog", "dogs", "don't",
+         "cat", "catalog", "zebra", "a", "the", "2020", "Pizza!"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    rng = random.Random(11)
+    lines = []
+    for _ in range(400):
+        setup = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(1, 6)))
+        punch = " ".join(rng.choice(WORDS) for _ in range(rng.randrange(0, 4)))
+        lines.append(f"{setup}?{punch}")
+    path = tmp_path / "jokes.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    with JokeCorpus(str(path)) as c:
+        yield c
+
+
+def brute_force(corpus, query):
+    words = [set(tokenize(corpus[i])) for i in range(len(corpus))]
+    hits = []
+    for i, joke_words in enumerate(words):
+        ok = True
+        for raw in query.lower().split():
+            for j, term in enumerate(tokenize(raw)):
+                if raw.endswith("*") and j == len(tokenize(raw)) - 1:
+                    ok &= any(w.startswith(term) for w in joke_words)
+                else:
+                    ok &= term in joke_words
+        if ok:
+            hits.append(i)
+    return hits
+
+
+QUERIES = ["pizza", "pizz*", "p*", "dog", "dog*", "don't", "chicken road", "cat* road",
+           "Pizza", "zebra pie dogs", "2020", "nothing", "nothing*", "z*", "*", "", "!!"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(corpus, query):
+    index = JokeIndex.build(corpus)
+    expected = brute_force(corpus, query) if index.terms(query) else []
+    assert index.search(query) == expected
+    assert index.search(query, limit=3) == expected[:3]
+
+    rng = random.Random(query)
+    for _ in range(20):
+        match = index.random_match(query, rng)
+        if expected:
+            assert match in expected
+        else:
+            assert match is None
+
+
+def test_random_prefix_match_is_uniform(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_text("pizza pizzeria?\npizza?\n", encoding="utf-8")
+    with JokeCorpus(str(path)) as c:
+        index = JokeIndex.build(c)
+        rng = random.Random(5)
+        picks = [index.random_match("pizz*", rng) for _ in range(4000)]
+    assert 1800 < picks.count(0) < 2200
+
+
+def test_index_saved_and_reloaded(corpus, tmp_path):
+    built = JokeIndex.open(corpus)
+    path = corpus.path + ".search"
+    loaded = JokeIndex.load(path, corpus.signature)
+    assert loaded is not None
+    assert loaded.words == built.words
+    assert list(loaded.starts) == list(built.starts)
+    assert list(loaded.postings) == list(built.postings)
+    for query in QUERIES:
+        assert loaded.search(query) == built.search(query)
+
+    # Another file version, or a cut-short file, is not used
+    assert JokeIndex.load(path, (0, 0)) is None
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 4)
+    assert JokeIndex.load(path, corpus.signature) is None
+
+
+def test_dedup_corpus_gets_its_own_index_file(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_text("a b?c\na b?c\nd?e\n", encoding="utf-8")
+    with JokeCorpus(str(path), dedup=0.8) as corpus:
+        assert len(corpus) == 2
+        index = JokeIndex.open(corpus)
+        assert index.search("d") == [1]
+    assert (tmp_path / "jokes.txt.dedup0.8.search").exists()
@@ -0,0 +1,29 @@
+from joke_corpus import MISSING_PUNCHLINE, JokeCorpus
+from joke_store import JokeStore
+
+LINES = ["Why did the chicken cross the road?To get to the other side.",
+         "   ", "No punchline here", "",
+         "  What is brown and sticky?A stick.  ", "Ünïcode joke?Yes 🎉",
+         "Why did the duck cross the road?To get to the other side.",
+         "Another one without"]
+
+
+def test_matches_corpus(tmp_path):
+    path = tmp_path / "jokes.txt"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    with JokeCorpus(str(path)) as corpus:
+        store = JokeStore.from_corpus(corpus)
+        assert len(store) == len(corpus)
+        for i in range(len(corpus)):
+            assert store.joke(i) == corpus.joke(i)
+
+
+def test_missing():
+    store = JokeStore.from_lines(LINES)
+    assert [store.missing(i) for i in range(len(store))] == [False, True, False, False,
+                                                            False, True]
+    assert store.joke(1) == ("No punchline here?", MISSING_PUNCHLINE)
+    assert store.joke(1)[1] is store.joke(5)[1]
+    assert store.joke(4) == ("Why did the duck cross the road?", "To get to the other side.")
+    assert store.nbytes() < sum(len(line.strip().encode()) + 1 for line in LINES if line.strip()) \
+        + 17 * len(store) + 8
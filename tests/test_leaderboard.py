@@ -0,0 +1,170 @@
+import random
+from bisect import bisect_left, insort
+
+import pytest
+
+from leaderboard import MAX_SCORE, Leaderboard, ScoreIndex, SortedKeys, key_seq, rank_key
+
+
+class SmallSortedKeys(SortedKeys):
+    # Tiny chunks so a few hundred keys exercise splits and a deep Fenwick tree
+    LOAD = 4
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sorted_keys_matches_bisect(seed):
+    rng = random.Random(seed)
+    initial = sorted(rng.randrange(-50, 50) for _ in range(rng.randrange(0, 40)))
+    keys = SmallSortedKeys(initial)
+    expected = list(initial)
+    for _ in range(400):
+        key = rng.randrange(-60, 60)
+        keys.add(key)
+        insort(expected, key)
+
+        probe = rng.randrange(-70, 70)
+        assert keys.bisect_left(probe) == bisect_left(expected, probe)
+        start = rng.randrange(0, len(expected) + 2)
+        stop = start + rng.randrange(0, 12)
+        assert list(keys.slice(start, stop)) == expected[start:stop]
+
+    assert len(keys) == len(expected)
+    assert list(keys) == expected
+    for pos in range(len(expected)):
+        chunk, offset = keys._locate(pos)
+        assert keys.chunks[chunk][offset] == expected[pos]
+
+
+def test_sorted_keys_empty():
+    keys = SmallSortedKeys()
+    assert keys.bisect_left(3) == 0
+    assert list(keys.slice(0, 5)) == []
+    keys.add(3)
+    assert list(keys.slice(0, 5)) == [3]
+
+
+def random_entries(rng, n):
+    names = [f"p{i}" for i in range(12)]
+    return [(rng.choice(names), rng.randrange(0, 11), rng.choice(["Easy", "Medium", "Hard"]))
+            for _ in range(n)]
+
+
+def ranked(entries, difficulty=None):
+    """(seq, entry) best first: higher score, then the earlier save."""
+    order = [(seq, e) for seq, e in enumerate(entries) if difficulty in (None, e[2])]
+    return sorted(order, key=lambda item: (-item[1][1], item[0]))
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_score_index_rank_and_page_match_sorted_list(bulk):
+    rng = random.Random(7)
+    entries = random_entries(rng, 600)
+    index = ScoreIndex()
+    if bulk:
+        index.begin_bulk()
+    for seq, (name, score, diff) in enumerate(entries):
+        assert index.add(name, score, diff, seq * 10) == seq
+    if bulk:
+        index.end_bulk()
+
+    for diff in ("Easy", "Medium", "Hard"):
+        order = ranked(entries, diff)
+        for name in {e[0] for e in entries}:
+            positions = [i for i, (_, e) in enumerate(order) if e[0] == name]
+            expected = positions[0] + 1 if positions else None
+            assert index.rank_of(name, diff) == expected
+    assert index.rank_of("nobody", "Easy") is None
+
+    for diff in (None, "Easy", "Hard"):
+        order = ranked(entries, diff)
+        for offset in (0, 1, 5, 137, len(order) - 3, len(order) + 4):
+            keys = index.page_keys(offset, 7, diff)
+            assert [key_seq(k) for k in keys] == [seq for seq, _ in order[offset:offset + 7]]
+
+    best = {}
+    for name, score, diff in entries:
+        best.setdefault(name, {})
+        best[name][diff] = max(best[name].get(diff, score), score)
+    for name, expected in best.items():
+        assert index.personal_best(name) == expected
+
+
+def test_rank_key_orders_score_then_save():
+    assert rank_key(9, 5) < rank_key(8, 0)
+    assert rank_key(9, 1) < rank_key(9, 2)
+    assert key_seq(rank_key(3, 123)) == 123
+
+
+def test_leaderboard_queries_survive_replay(tmp_path):
+    rng = random.Random(3)
+    entries = random_entries(rng, 150)
+    log = str(tmp_path / "scores.log")
+    board = Leaderboard(log, legacy_file=None)
+    for name, score, diff in entries:
+        board.add_score(name, score, diff)
+    board.close()
+
+    board = Leaderboard(log, legacy_file=None)
+    try:
+        order = ranked(entries)
+        page = board.page(10, 5)
+        assert [(e["name"], e["score"], e["difficulty"]) for e in page] == \
+            [e for _, e in order[10:15]]
+        assert [e["rank"] for e in page] == list(range(11, 16))
+
+        top = board.top_scores("Easy")
+        assert [(e["name"], e["score"]) for e in top] == \
+            [(e[0], e[1]) for _, e in ranked(entries, "Easy")[:board.size]]
+    finally:
+        board.close()
+
+
+@pytest.mark.parametrize("legacy", [
+    '{}', '[1, "x", {"name": "a"}]', 'not json',
+    '[{"name": "ann", "score": 4, "difficulty": "Easy"}, {"score": 9}]',
+])
+def test_broken_legacy_file_is_skipped(tmp_path, legacy):
+    legacy_file = tmp_path / "scores.json"
+    legacy_file.write_text(legacy)
+    board = Leaderboard(str(tmp_path / "scores.log"), legacy_file=str(legacy_file))
+    try:
+        assert all(e["name"] == "ann" for e in board.top_scores())
+    finally:
+        board.close()
+
+
+def test_incomplete_log_lines_are_skipped(tmp_path):
+    log = tmp_path / "scores.log"
+    log.write_text('{"name": "ann", "difficulty": "Easy"}\n[]\n'
+                   '{"name": "bo", "score": "7", "difficulty": "Easy"}\n'
+                   '{"name": "cy", "score": 5, "difficulty": "Easy"}\n')
+    board = Leaderboard(str(log), legacy_file=None)
+    try:
+        assert [e["name"] for e in board.top_scores()] == ["cy"]
+        assert [e["name"] for e in board.page()] == ["cy"]
+        board.compact()
+        assert log.read_text().count("\n") == 1
+    finally:
+        board.close()
+
+
+def test_out_of_range_scores_are_refused(tmp_path):
+    path = tmp_path / "scores.log"
+    lb = Leaderboard(str(path), legacy_file=None)
+    lb.add_score("a", MAX_SCORE, "Easy")
+    with pytest.raises(ValueError):
+        lb.add_score("b", -MAX_SCORE - 1, "Easy")
+    with pytest.raises(ValueError):
+        rank_key(MAX_SCORE + 1, 0)
+    lb.close()
+    assert path.read_text(encoding="utf-8").count("\n") == 1
+
+
+def test_unindexable_entries_are_skipped_on_replay(tmp_path):
+    path = tmp_path / "scores.log"
+    path.write_text('{"name":"a","score":9000000,"difficulty":"Easy"}\n'
+                    '{"name":"b","score":3,"difficulty":"Easy","date":7}\n'
+                    '{"name":"c","score":2,"difficulty":"Easy"}\n', encoding="utf-8")
+    lb = Leaderboard(str(path), legacy_file=None)
+    assert [e["name"] for e in lb.top_scores()] == ["c"]
+    lb.close()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import random
+import struct
+
+import pytest
+
+from adaptive import AdaptiveProfile
+from quiz_core import QuizEngine
+from quiz_journal import MAX_ANSWER, SessionJournal, generate, replay, save_session
+from quiz_server import QuizServer
+
+
+def test_journal_round_trip():
+    journal = SessionJournal(2**64 - 1, "Medium", 12)
+    for answer, elapsed in [("7", 1.5), ("", 30.0), ("ünï", 0.25), ("x" * 400, 2.0)]:
+        journal.record(answer, elapsed)
+    journal.finish(3)
+
+    loaded = SessionJournal.from_bytes(journal.to_bytes())
+    assert (loaded.seed, loaded.difficulty, loaded.max_questions, loaded.score) == \
+        (2**64 - 1, "Medium", 12, 3)
+    assert loaded.answers == ["7", "", "ünï", "x" * MAX_ANSWER]
+    assert list(loaded.elapsed) == [1.5, 30.0, 0.25, 2.0]
+
+
+def test_unfinished_journal_has_no_score():
+    journal = SessionJournal(5, "Easy", 10)
+    journal.record("4", 1.0)
+    loaded = SessionJournal.from_bytes(journal.to_bytes())
+    assert loaded.score is None
+    assert loaded.answers == ["4"]
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        SessionJournal.from_bytes(b"NOPE" + bytes(13))
+
+
+def test_replay_reproduces_sessions(tmp_path):
+    generate(str(tmp_path), 40, seed=9)
+    paths = sorted(tmp_path.iterdir())
+    assert len(paths) == 40
+    for path in paths:
+        result = replay(str(path))
+        assert result["ok"], result
+        assert result["answers"] == 10
+
+
+def test_replay_catches_a_wrong_score(tmp_path):
+    engine = QuizEngine("Hard", 5, seed=42)
+    SessionJournal.attach(engine)
+    while not engine.is_finished():
+        q = engine.new_question()
+        engine.submit_answer(str(q.answer))
+    path = save_session(engine, str(tmp_path))
+    assert os.path.basename(path) == f"{42:016x}.qzj"
+    assert replay(path)["score"] == 5
+
+    journal = SessionJournal.load(path)
+    journal.finish(4)
+    journal.save(path)
+    assert not replay(path)["ok"]
+
+
+def play_adaptive(path_dir, seed, rng):
+    profile = AdaptiveProfile("Medium", level=rng.uniform(0.5, 3.0))
+    for _ in range(rng.randrange(0, 20)):
+        profile.record(rng.choice("+-*/"), rng.random() < 0.7, rng.uniform(0.5, 15))
+    engine = QuizEngine("Medium", 10, seed=seed, adaptive=profile)
+    SessionJournal.attach(engine)
+    while not engine.is_finished():
+        q = engine.new_question()
+        answer = str(q.answer) if rng.random() < 0.7 else "0"
+        engine.submit_answer(answer, rng.uniform(0.5, 15))
+    return save_session(engine, path_dir), engine
+
+
+def test_replay_reproduces_adaptive_sessions(tmp_path):
+    rng = random.Random(4)
+    for seed in range(50):
+        path, engine = play_adaptive(str(tmp_path), seed, rng)
+        assert SessionJournal.load(path).profile is not None
+        result = replay(path)
+        assert result["ok"], result
+        assert result["score"] == engine.score
+
+
+def test_reads_version_one_journals():
+    name = b"Easy"
+    data = (b"QZJ1" + struct.pack("<QBI", 7, len(name), 10) + name
+            + bytes((1,)) + b"5" + struct.pack("<f", 1.5)
+            + bytes((0xFF,)) + struct.pack("<I", 1))
+    journal = SessionJournal.from_bytes(data)
+    assert (journal.seed, journal.difficulty, journal.profile, journal.score) == (7, "Easy", None, 1)
+    assert journal.answers == ["5"]
+    assert list(journal.elapsed) == [1.5]
+
+
+def test_server_journals_sessions_dropped_by_their_client(tmp_path):
+    server = QuizServer(str(tmp_path))
+    writer = object()
+
+    async def session():
+        server.loop = asyncio.get_running_loop()
+        reply = server.start_session(writer, "Easy", 10)
+        server.answer(reply["session"], reply["number"], "1")
+        server._drop_connection(writer)
+
+    asyncio.run(session())
+    assert not server.sessions
+    (name,) = os.listdir(tmp_path)
+    result = replay(str(tmp_path / name))
+    assert result["answers"] == 1 and result["ok"]
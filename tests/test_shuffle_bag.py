@@ -0,0 +1,80 @@
+import random
+import struct
+
+import pytest
+
+from shuffle_bag import ShuffleBag
+
+
+def draw_round(bag):
+    return [bag.draw() for _ in range(bag.remaining())]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 50])
+def test_every_index_once_per_round(size):
+    bag = ShuffleBag(size, seed=size)
+    last = None
+    for _ in range(20):
+        drawn = [bag.draw() for _ in range(size)]
+        assert sorted(drawn) == list(range(size))
+        if size > 1:
+            # A round never opens with the joke that closed the previous one
+            assert drawn[0] != last
+        last = drawn[-1]
+        assert bag.remaining() == 0
+
+
+def test_empty_bag():
+    with pytest.raises(IndexError):
+        ShuffleBag(0).draw()
+
+
+def test_resize_keeps_the_round_consistent():
+    rng = random.Random(1)
+    for trial in range(200):
+        size = rng.randrange(1, 40)
+        bag = ShuffleBag(size, seed=trial)
+        drawn = [bag.draw() for _ in range(rng.randrange(0, size + 1))]
+        new_size = rng.randrange(0, 60)
+        bag.resize(new_size)
+
+        assert sorted(bag.perm) == list(range(new_size))
+        kept = [i for i in drawn if i < new_size]
+        assert sorted(bag.perm[:bag.cursor]) == sorted(kept)
+        rest = draw_round(bag) if new_size else []
+        # The rest of the round is exactly what has not been drawn yet
+        assert sorted(kept + rest) == list(range(new_size))
+
+
+def test_bytes_round_trip():
+    bag = ShuffleBag(30, seed=5)
+    for _ in range(12):
+        bag.draw()
+    copy = ShuffleBag.from_bytes(bag.to_bytes(), seed=9)
+    assert list(copy.perm) == list(bag.perm)
+    assert (copy.cursor, copy.last) == (bag.cursor, bag.last)
+    assert sorted(draw_round(copy) + list(bag.perm[:bag.cursor])) == list(range(30))
+
+
+@pytest.mark.parametrize("data", [b"", b"NOPE" + bytes(24), None])
+def test_bad_bytes_are_rejected(data):
+    if data is None:
+        data = ShuffleBag(10).to_bytes()[:-4]
+    with pytest.raises((ValueError, struct.error)):
+        ShuffleBag.from_bytes(data)
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "jokes.bag")
+    bag = ShuffleBag(10, seed=1)
+    first = [bag.draw() for _ in range(4)]
+    bag.save(path)
+
+    loaded = ShuffleBag.load(path, size=12)
+    assert list(loaded.perm[:4]) == first
+    assert sorted(first + draw_round(loaded)) == list(range(12))
+
+    fresh = ShuffleBag.load(str(tmp_path / "missing.bag"), size=7)
+    assert (len(fresh), fresh.cursor) == (7, 0)
+    (tmp_path / "junk.bag").write_bytes(b"junk")
+    assert len(ShuffleBag.load(str(tmp_path / "junk.bag"), size=3)) == 3
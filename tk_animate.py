@@ -0,0 +1,78 @@
+"""
+Typewriter-style text reveal driven by one fixed-rate frame clock.
+
+Every animated widget is advanced from the same frame callback, scheduled
+on a tk_scheduler.Scheduler. Each frame shows as many characters as the
+time since the animation started allows, so the number of callbacks
+depends on how long an animation runs and not on how long its text is, and
+a slow frame is caught up on the next one instead of pushing the rest back.
+"""
+import math
+
+
+class TextAnimation:
+    __slots__ = ("widget", "text", "start", "cps", "shown", "on_done")
+
+    def __init__(self, widget, text, start, cps, on_done):
+        self.widget = widget
+        self.text = text
+        self.start = start
+        self.cps = cps
+        self.shown = -1
+        self.on_done = on_done
+
+
+class TextAnimator:
+    def __init__(self, scheduler, fps=60, cps=1000 / 30):
+        self.scheduler = scheduler
+        self.period = 1.0 / fps
+        # Default speed in characters per second
+        self.cps = cps
+        self.running = {}
+        self._frame_handle = None
+        self._next_frame = None
+
+    def animate(self, widget, text, cps=None, on_done=None):
+        """Reveal text in widget, replacing whatever was animating there."""
+        now = self.scheduler.clock()
+        self.running[widget] = TextAnimation(widget, text, now, cps or self.cps, on_done)
+        widget.config(text="")
+        if self._frame_handle is None:
+            self._next_frame = now
+            self._frame_handle = self.scheduler.call_at(now, self._frame)
+
+    def cancel(self, widget):
+        self.running.pop(widget, None)
+        if not self.running:
+            self._stop()
+
+    def cancel_all(self):
+        self.running.clear()
+        self._stop()
+
+    def _stop(self):
+        self.scheduler.cancel(self._frame_handle)
+        self._frame_handle = None
+
+    def _frame(self):
+        self._frame_handle = None
+        now = self.scheduler.clock()
+        finished = []
+        for widget, anim in self.running.items():
+            shown = min(len(anim.text), int((now - anim.start) * anim.cps))
+            if shown != anim.shown:
+                anim.shown = shown
+                widget.config(text=anim.text[:shown])
+            if shown == len(anim.text):
+                finished.append(anim)
+        for anim in finished:
+            if self.running.get(anim.widget) is anim:
+                del self.running[anim.widget]
+            if anim.on_done is not None:
+                anim.on_done()
+
+        if self.running and self._frame_handle is None:
+            # Stay on the frame grid; frames we were too slow for are skipped
+            behind = max(1, math.floor((now - self._next_frame) / self.period) + 1)
+            self._next_frame += behind * self.period
+            self._frame_handle = self.scheduler.call_at(self._next_frame, self._frame)
@@ -0,0 +1,89 @@
+"""
+Vertical gradient backgrounds as one cached PhotoImage.
+
+The colours are worked out once per height into a strip one pixel wide and
+written with a single put(). Full-size images are zoomed from that strip
+inside Tk, so a change of width never recomputes a colour and a change of
+height only redoes one column. A canvas shows the result as a single image
+item instead of one line item per row.
+"""
+from collections import OrderedDict
+
+import tkinter as tk
+
+
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def gradient_rows(color1, color2, height):
+    """One '#rrggbb' colour per row, top to bottom."""
+    r1, g1, b1 = hex_to_rgb(color1)
+    r2, g2, b2 = hex_to_rgb(color2)
+    dr, dg, db = r2 - r1, g2 - g1, b2 - b1
+    return [f"#{int(r1 + dr * i / height):02x}{int(g1 + dg * i / height):02x}"
+            f"{int(b1 + db * i / height):02x}" for i in range(height)]
+
+
+class GradientCache:
+    """PhotoImages keyed by (color1, color2, width, height), least recently used dropped first."""
+    def __init__(self, master=None, maxsize=8):
+        self.master = master
+        self.maxsize = maxsize
+        self._strips = OrderedDict()
+        self._images = OrderedDict()
+
+    def _remember(self, cache, key, image):
+        cache[key] = image
+        while len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def strip(self, color1, color2, height):
+        key = (color1, color2, height)
+        image = self._strips.get(key)
+        if image is None:
+            image = tk.PhotoImage(master=self.master, width=1, height=height)
+            # Each {colour} is a row of one pixel
+            image.put(" ".join("{%s}" % c for c in gradient_rows(color1, color2, height)))
+            self._remember(self._strips, key, image)
+        else:
+            self._strips.move_to_end(key)
+        return image
+
+    def get(self, color1, color2, width, height):
+        width, height = max(1, width), max(1, height)
+        key = (color1, color2, width, height)
+        image = self._images.get(key)
+        if image is None:
+            image = self.strip(color1, color2, height).zoom(width, 1)
+            self._remember(self._images, key, image)
+        else:
+            self._images.move_to_end(key)
+        return image
+
+
+class GradientBackground:
+    """Keeps a canvas filled with a gradient image, following its size."""
+    def __init__(self, canvas, color1, color2, cache=None):
+        self.canvas = canvas
+        self.color1 = color1
+        self.color2 = color2
+        self.cache = cache or GradientCache(canvas)
+        self.size = (int(canvas.cget("width")), int(canvas.cget("height")))
+        self.item = canvas.create_image(0, 0, anchor="nw", image=self._image())
+        canvas.tag_lower(self.item)
+        canvas.bind("<Configure>", self._on_configure, add="+")
+
+    def _image(self):
+        return self.cache.get(self.color1, self.color2, *self.size)
+
+    def _on_configure(self, event):
+        size = (event.width, event.height)
+        if size != self.size:
+            self.size = size
+            self.canvas.itemconfigure(self.item, image=self._image())
+
+    def set_colors(self, color1, color2):
+        self.color1, self.color2 = color1, color2
+        self.canvas.itemconfigure(self.item, image=self._image())
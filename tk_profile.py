@@ -0,0 +1,120 @@
+"""
+Optional latency profiling for Tk event handlers.
+
+HandlerProfiler.install() swaps tkinter's CallWrapper, the object Tk goes
+through for every Python callback (button commands, bindings, after() jobs,
+window protocols), for one that times each call. Wall time per handler goes
+into a ring of per-window histograms, so the figures cover the last minute
+or so rather than the whole run. Nothing is patched unless install() is
+called, so a GUI that never enables profiling pays nothing.
+"""
+import json
+import time
+
+from latency import Histogram
+
+
+def handler_name(func):
+    func = getattr(func, "__func__", func)
+    return getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or repr(func)
+
+
+class HandlerProfiler:
+    def __init__(self, window_seconds=10.0, windows=6, clock=time.perf_counter):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.ring = [{} for _ in range(windows)]
+        self.slot = 0
+        self.window_start = clock()
+        self._original = None
+
+    # ---------- recording ----------
+    def record(self, name, seconds):
+        now = self.clock()
+        if now - self.window_start >= self.window_seconds:
+            self._advance(now)
+        window = self.ring[self.slot]
+        entry = window.get(name)
+        if entry is None:
+            entry = window[name] = [Histogram(), 0.0]
+        entry[0].add(seconds)
+        if seconds > entry[1]:
+            entry[1] = seconds
+
+    def _advance(self, now):
+        skipped = int((now - self.window_start) // self.window_seconds)
+        for _ in range(min(skipped, len(self.ring))):
+            self.slot = (self.slot + 1) % len(self.ring)
+            self.ring[self.slot] = {}
+        self.window_start += skipped * self.window_seconds
+
+    def call(self, func, *args):
+        """Run func(*args) and record its wall time, e.g. for Scheduler jobs."""
+        start = self.clock()
+        try:
+            return func(*args)
+        finally:
+            self.record(handler_name(func), self.clock() - start)
+
+    # ---------- hooking Tk ----------
+    def install(self):
+        """Time every Tk callback registered from now on."""
+        import tkinter
+
+        if self._original is not None:
+            return
+        self._original = original = tkinter.CallWrapper
+        profiler = self
+
+        class ProfiledCallWrapper(original):
+            def __init__(self, func, subst, widget):
+                super().__init__(func, subst, widget)
+                self.name = handler_name(func)
+
+            def __call__(self, *args):
+                start = profiler.clock()
+                try:
+                    return super().__call__(*args)
+                finally:
+                    profiler.record(self.name, profiler.clock() - start)
+
+        tkinter.CallWrapper = ProfiledCallWrapper
+
+    def uninstall(self):
+        import tkinter
+
+        if self._original is not None:
+            tkinter.CallWrapper = self._original
+            self._original = None
+
+    # ---------- reporting ----------
+    def totals(self):
+        merged = {}
+        for window in self.ring:
+            for name, (hist, worst) in window.items():
+                entry = merged.setdefault(name, [Histogram(), 0.0])
+                entry[0].merge(hist)
+                entry[1] = max(entry[1], worst)
+        return merged
+
+    def slowest(self, n=3):
+        """[(handler, worst ms, p99 ms, calls)] over the ring, worst first."""
+        rows = [(name, worst * 1000, hist.percentile(99), hist.total())
+                for name, (hist, worst) in self.totals().items()]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows[:n]
+
+    def status_text(self, n=3):
+        rows = self.slowest(n)
+        if not rows:
+            return "Slowest handlers: -"
+        return "Slowest handlers: " + ", ".join(
+            f"{name.rsplit('.', 1)[-1]} {worst:.0f}ms" for name, worst, _, _ in rows)
+
+    def dump(self, path):
+        data = {}
+        for name, (hist, worst) in self.totals().items():
+            data[name] = dict(hist.summary(), max_ms=round(worst * 1000, 3))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"window_seconds": self.window_seconds, "windows": len(self.ring),
+                       "handlers": data}, f, indent=2)
@@ -0,0 +1,119 @@
+"""
+Deadline-based scheduling on top of a Tk event loop.
+
+Callbacks are queued against absolute time.monotonic() deadlines and a
+single after() job is kept pending for the earliest one, so timers do not
+drift and idle windows do not wake up. Nothing here imports tkinter; any
+object with after()/after_cancel() can drive a Scheduler.
+"""
+import heapq
+import itertools
+import math
+import time
+
+
+class Scheduler:
+    def __init__(self, widget, clock=time.monotonic, profiler=None):
+        self.widget = widget
+        self.clock = clock
+        # A tk_profile.HandlerProfiler, to time each job rather than the shared after()
+        self.profiler = profiler
+        self._heap = []
+        self._seq = itertools.count()
+        self._after_id = None
+        self._armed_for = None
+
+    def call_at(self, deadline, callback, *args):
+        """Run callback(*args) once the clock reaches deadline. Returns a handle for cancel()."""
+        entry = [deadline, next(self._seq), callback, args]
+        heapq.heappush(self._heap, entry)
+        self._arm()
+        return entry
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def cancel(self, handle):
+        if handle is not None:
+            handle[2] = None
+
+    def cancel_all(self):
+        self._heap.clear()
+        self._disarm()
+
+    def _disarm(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._armed_for = None
+
+    def _arm(self):
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        if not heap:
+            self._disarm()
+            return
+
+        deadline = heap[0][0]
+        if self._after_id is not None and self._armed_for <= deadline:
+            return
+        self._disarm()
+        ms = max(0, math.ceil((deadline - self.clock()) * 1000))
+        self._after_id = self.widget.after(ms, self._run)
+        self._armed_for = deadline
+
+    def _run(self):
+        self._after_id = None
+        self._armed_for = None
+        heap = self._heap
+        now = self.clock()
+        while heap and heap[0][0] <= now:
+            _, _, callback, args = heapq.heappop(heap)
+            if callback is None:
+                continue
+            if self.profiler is None:
+                callback(*args)
+            else:
+                self.profiler.call(callback, *args)
+        self._arm()
+
+
+class Countdown:
+    """
+    Shows the whole seconds left until a deadline and fires once when it
+    passes. on_tick(seconds) runs only when the displayed number changes;
+    on_expire() runs from a single callback at the deadline itself.
+    """
+    def __init__(self, scheduler, seconds, on_tick, on_expire):
+        self.scheduler = scheduler
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.deadline = scheduler.clock() + seconds
+        self._tick_handle = None
+        self._expire_handle = scheduler.call_at(self.deadline, self._expire)
+        self._tick()
+
+    def remaining(self):
+        return max(0.0, self.deadline - self.scheduler.clock())
+
+    def _tick(self):
+        shown = math.ceil(self.remaining())
+        self.on_tick(shown)
+        if shown > 1:
+            # Next change happens when exactly shown-1 seconds are left
+            self._tick_handle = self.scheduler.call_at(self.deadline - (shown - 1), self._tick)
+
+    def _expire(self):
+        self._expire_handle = None
+        self.scheduler.cancel(self._tick_handle)
+        self.on_tick(0)
+        self.on_expire()
+
+    def cancel(self):
+        self.scheduler.cancel(self._tick_handle)
+        self.scheduler.cancel(self._expire_handle)
+        self._tick_handle = self._expire_handle = None